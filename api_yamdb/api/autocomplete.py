@@ -0,0 +1,107 @@
+import re
+from bisect import bisect_left, insort
+from threading import RLock
+
+from api.cache import get_versions
+from reviews.models import Title
+
+WORD_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Приводит строку к виду для сравнения: регистр, «ё», пробелы."""
+    return ' '.join(text.casefold().replace('ё', 'е').split())
+
+
+class TitlePrefixIndex:
+    """Отсортированный индекс префиксов названий произведений.
+
+    Хранится в памяти процесса: каждое название индексируется с начала
+    каждого слова, поиск выполняется двоичным поиском по префиксу.
+    Если версия Title изменилась с момента загрузки, индекс загружается
+    заново: так видны изменения, сделанные другими процессами.
+    """
+
+    def __init__(self):
+        self._lock = RLock()
+        self._keys = None
+        self._titles = {}
+        self._version = None
+
+    def clear(self, **kwargs):
+        with self._lock:
+            self._keys = None
+            self._titles = {}
+
+    def _load(self, version):
+        self._version = version
+        self._keys = []
+        self._titles = {}
+        for title_id, name, year in Title.objects.values_list(
+            'id', 'name', 'year'
+        ).iterator():
+            self._add(title_id, name, year)
+        self._keys.sort()
+
+    @staticmethod
+    def _get_keys(title_id, name):
+        normalized = normalize(name)
+        return [
+            (normalized[match.start():], title_id)
+            for match in WORD_RE.finditer(normalized)
+        ]
+
+    def _add(self, title_id, name, year, keep_sorted=False):
+        keys = self._get_keys(title_id, name)
+        self._titles[title_id] = (name, year, keys)
+        for key in keys:
+            if keep_sorted:
+                insort(self._keys, key)
+            else:
+                self._keys.append(key)
+
+    def _remove(self, title_id):
+        _, _, keys = self._titles.pop(title_id, (None, None, ()))
+        for key in keys:
+            position = bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+
+    def update(self, title_id, name, year):
+        with self._lock:
+            if self._keys is None:
+                return
+            self._remove(title_id)
+            self._add(title_id, name, year, keep_sorted=True)
+
+    def remove(self, title_id):
+        with self._lock:
+            if self._keys is not None:
+                self._remove(title_id)
+
+    def search(self, text, limit):
+        prefix = normalize(text)
+        if not prefix:
+            return []
+        [version] = get_versions((Title,))
+        with self._lock:
+            if self._keys is None or version != self._version:
+                self._load(version)
+            results = []
+            seen = set()
+            position = bisect_left(self._keys, (prefix,))
+            while position < len(self._keys) and len(results) < limit:
+                key, title_id = self._keys[position]
+                if not key.startswith(prefix):
+                    break
+                if title_id not in seen:
+                    seen.add(title_id)
+                    name, year, _ = self._titles[title_id]
+                    results.append(
+                        {'id': title_id, 'name': name, 'year': year}
+                    )
+                position += 1
+            return results
+
+
+title_prefix_index = TitlePrefixIndex()
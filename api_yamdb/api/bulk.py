@@ -0,0 +1,227 @@
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import F, Max, Q
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from api.autocomplete import title_prefix_index
+from api.cache import bump_version
+from api.cards import schedule_title_cards_rebuild
+from api.facets import title_facet_index
+from reviews.models import Category, Genre, GenreTitle, Title, TitleRanking
+
+BULK_MAX_ITEMS = 1000
+TITLE_FIELDS = ('name', 'year', 'description', 'category')
+
+
+class TitleBulkItemSerializer(serializers.ModelSerializer):
+    """Проверка одного произведения пакета без обращения к базе.
+
+    Слаги категорий и жанров всего пакета разрешаются потом разом.
+    """
+
+    id = serializers.IntegerField(required=False)
+    category = serializers.CharField()
+    genre = serializers.ListField(child=serializers.CharField())
+
+    class Meta:
+        model = Title
+        fields = ('id', 'name', 'year', 'description', 'category', 'genre')
+
+
+def does_not_exist(slug):
+    return serializers.SlugRelatedField.default_error_messages[
+        'does_not_exist'
+    ].format(slug_name='slug', value=slug)
+
+
+class TitleBulkWriter:
+    """Создание и изменение пакета произведений в одной транзакции.
+
+    Элементы с `id` изменяют существующие произведения (передаются только
+    меняемые поля), остальные создаются. Ошибки собираются по элементам,
+    при любой ошибке ничего не записывается.
+    """
+
+    def __init__(self, items):
+        self.items = items
+
+    def validate(self):
+        if not isinstance(self.items, list):
+            raise ValidationError(
+                {'non_field_errors': ['Ожидается список произведений.']}
+            )
+        if len(self.items) > BULK_MAX_ITEMS:
+            raise ValidationError({'non_field_errors': [
+                f'Не больше {BULK_MAX_ITEMS} произведений за запрос.'
+            ]})
+        creating = TitleBulkItemSerializer()
+        updating = TitleBulkItemSerializer(partial=True)
+        self.errors = [{} for _ in self.items]
+        self.data = [None] * len(self.items)
+        for index, item in enumerate(self.items):
+            serializer = updating
+            if not isinstance(item, dict) or 'id' not in item:
+                serializer = creating
+            try:
+                self.data[index] = serializer.run_validation(item)
+            except ValidationError as error:
+                self.errors[index] = error.detail
+        self.resolve()
+        if any(self.errors):
+            raise ValidationError(self.errors)
+
+    def add_error(self, index, field, message):
+        self.errors[index].setdefault(field, []).append(message)
+
+    def resolve(self):
+        """Разрешает слаги и id всего пакета тремя запросами."""
+        valid = [
+            (index, data) for index, data in enumerate(self.data)
+            if data is not None
+        ]
+        self.categories = dict(Category.objects.filter(slug__in={
+            data['category'] for _, data in valid if 'category' in data
+        }).values_list('slug', 'pk'))
+        self.genres = dict(Genre.objects.filter(slug__in={
+            slug for _, data in valid for slug in data.get('genre', ())
+        }).values_list('slug', 'pk'))
+        self.titles = Title.objects.in_bulk({
+            data['id'] for _, data in valid if 'id' in data
+        })
+        seen = set()
+        for index, data in valid:
+            if 'id' in data:
+                if data['id'] not in self.titles:
+                    self.add_error(index, 'id', 'Произведение не найдено.')
+                elif data['id'] in seen:
+                    self.add_error(
+                        index, 'id', 'Произведение повторяется в пакете.'
+                    )
+                seen.add(data['id'])
+            slug = data.get('category')
+            if slug is not None and slug not in self.categories:
+                self.add_error(index, 'category', does_not_exist(slug))
+            for slug in data.get('genre', ()):
+                if slug not in self.genres:
+                    self.add_error(index, 'genre', does_not_exist(slug))
+
+    def save(self):
+        """Записывает пакет и возвращает id произведений в порядке пакета."""
+        titles = []
+        links = {}
+        for data in self.data:
+            title = self.titles[data['id']] if 'id' in data else Title()
+            for field in TITLE_FIELDS:
+                if field == 'category' and 'category' in data:
+                    title.category_id = self.categories[data['category']]
+                elif field in data:
+                    setattr(title, field, data[field])
+            if 'genre' in data:
+                links[id(title)] = {
+                    self.genres[slug] for slug in data['genre']
+                }
+            titles.append(title)
+        created = [title for title in titles if title.pk is None]
+        updated = [title for title in titles if title.pk is not None]
+        with transaction.atomic():
+            self.create_titles(created)
+            Title.objects.bulk_update(updated, TITLE_FIELDS)
+            added = self.set_genres(
+                {title.pk: links[id(title)]
+                 for title in titles if id(title) in links},
+                {title.pk for title in updated}
+            )
+            self.refresh(titles, added)
+        bump_version(Title)
+        bump_version(GenreTitle)
+        return [title.pk for title in titles]
+
+    @staticmethod
+    def get_last_pk():
+        """Наибольший выданный id произведения, включая удалённые.
+
+        В SQLite счётчик AUTOINCREMENT хранится в sqlite_sequence и не
+        уменьшается после очистки, поэтому id не используются повторно.
+        """
+        last_pk = Title.all_objects.aggregate(last=Max('pk'))['last'] or 0
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT seq FROM sqlite_sequence WHERE name = %s',
+                    [Title._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row is not None:
+                last_pk = max(last_pk, row[0])
+        return last_pk
+
+    def create_titles(self, titles):
+        if not titles:
+            return
+        if not connection.features.can_return_rows_from_bulk_insert:
+            # Без RETURNING id назначаются явно внутри транзакции. Пустое
+            # обновление берёт блокировку на запись до чтения счётчика:
+            # транзакция SQLite, начатая с чтения, не дожидается этой
+            # блокировки и падает с «database is locked».
+            Title.all_objects.filter(pk=0).update(year=F('year'))
+            last_pk = self.get_last_pk()
+            for offset, title in enumerate(titles, start=1):
+                title.pk = last_pk + offset
+        Title.objects.bulk_create(titles)
+        TitleRanking.objects.bulk_create(
+            [TitleRanking(title_id=title.pk) for title in titles],
+            ignore_conflicts=True
+        )
+
+    @staticmethod
+    def set_genres(links, updated_ids):
+        """Приводит связи с жанрами к заданным одной вставкой и удалением.
+
+        Удаление идёт через QuerySet.delete(), его сигналы post_delete
+        обновляют карточки и индексы. Возвращает добавленные связи.
+        """
+        existing = defaultdict(set)
+        for title_id, genre_id in GenreTitle.objects.filter(
+            title_id__in=updated_ids & set(links)
+        ).values_list('title_id', 'genre_id'):
+            existing[title_id].add(genre_id)
+        removed = Q()
+        added = {}
+        for title_id, genre_ids in links.items():
+            if existing[title_id] - genre_ids:
+                removed |= Q(
+                    title_id=title_id,
+                    genre_id__in=existing[title_id] - genre_ids
+                )
+            added[title_id] = genre_ids - existing[title_id]
+        if removed:
+            GenreTitle.objects.filter(removed).delete()
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title_id=title_id, genre_id=genre_id)
+            for title_id, genre_ids in added.items()
+            for genre_id in genre_ids
+        )
+        return added
+
+    @staticmethod
+    def refresh(titles, added):
+        """Обновляет то, что для save() и add() делают сигналы моделей."""
+        values = [
+            (title.pk, title.name, title.year, title.category_id)
+            for title in titles
+        ]
+        schedule_title_cards_rebuild(title.pk for title in titles)
+
+        def update_indexes():
+            for title_id, name, year, category_id in values:
+                title_prefix_index.update(title_id, name, year)
+                title_facet_index.update_title(
+                    title_id, name, year, category_id
+                )
+                title_facet_index.add_links(
+                    title_id, added.get(title_id, ())
+                )
+
+        transaction.on_commit(update_indexes)
@@ -0,0 +1,81 @@
+import time
+from datetime import datetime
+from hashlib import md5
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'version:{}'
+MODIFIED_KEY = 'modified:{}'
+RESPONSE_KEY = 'catalog:response:{}'
+
+
+def get_catalog_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def get_version_key(model):
+    return VERSION_KEY.format(model._meta.label_lower)
+
+
+def get_modified_key(model):
+    return MODIFIED_KEY.format(model._meta.label_lower)
+
+
+def bump_version(model):
+    """Инвалидирует закэшированные ответы, зависящие от модели."""
+    cache = get_catalog_cache()
+    key = get_version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Счётчик вытеснен или ещё не создан: начинаем с метки времени,
+        # чтобы не совпасть с версиями старых записей.
+        cache.set(key, time.time_ns(), timeout=None)
+    cache.set(get_modified_key(model), time.time(), timeout=None)
+
+
+def get_versions(models):
+    """Возвращает текущие версии моделей одним запросом к кэшу."""
+    cache = get_catalog_cache()
+    keys = [get_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def get_last_modified(models):
+    """Время последнего изменения моделей (timestamp) или None."""
+    cache = get_catalog_cache()
+    modified = cache.get_many([get_modified_key(model) for model in models])
+    return max(modified.values(), default=None)
+
+
+def get_request_fingerprint(request, models):
+    """Отпечаток запроса: адрес, нормализованная строка запроса и версии."""
+    query = urlencode(sorted(
+        (param, value)
+        for param, values in request.query_params.lists()
+        for value in values
+    ))
+    versions = '.'.join(str(version) for version in get_versions(models))
+    url = request.build_absolute_uri(request.path)
+    digest = md5(f'{url}?{query}'.encode('utf-8')).hexdigest()
+    return f'{versions}:{digest}'
+
+
+def get_response_key(request, models):
+    return RESPONSE_KEY.format(get_request_fingerprint(request, models))
+
+
+def max_timestamp(*values):
+    """Наибольшая из меток времени (timestamp или datetime) или None."""
+    timestamps = [
+        value.timestamp() if isinstance(value, datetime) else value
+        for value in values if value is not None
+    ]
+    return max(timestamps, default=None)
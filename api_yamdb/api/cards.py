@@ -0,0 +1,62 @@
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import RenderedFragments
+from api.serializers import TitleGETSerializer
+from reviews.models import Title, TitleCard
+
+REBUILD_BATCH_SIZE = 500
+
+
+def render_title_card(title):
+    """Рендерит произведение так же, как список произведений."""
+    return JSONRenderer().render(TitleGETSerializer(title).data).decode()
+
+
+def rebuild_title_cards(title_ids=None):
+    """Перестраивает карточки указанных (или всех) произведений."""
+    titles = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre').order_by('pk')
+    if title_ids is not None:
+        titles = titles.filter(pk__in=list(title_ids))
+    rebuilt = 0
+    last_pk = 0
+    while True:
+        batch = list(titles.filter(pk__gt=last_pk)[:REBUILD_BATCH_SIZE])
+        if not batch:
+            return rebuilt
+        cards = [
+            TitleCard(title=title, data=render_title_card(title))
+            for title in batch
+        ]
+        with transaction.atomic():
+            TitleCard.objects.filter(
+                title_id__in=[title.pk for title in batch]
+            ).delete()
+            TitleCard.objects.bulk_create(cards, ignore_conflicts=True)
+        rebuilt += len(cards)
+        last_pk = batch[-1].pk
+
+
+def schedule_title_cards_rebuild(title_ids):
+    """Перестраивает карточки после фиксации текущей транзакции."""
+    title_ids = set(title_ids)
+    if title_ids:
+        transaction.on_commit(lambda: rebuild_title_cards(title_ids))
+
+
+def get_title_cards(ids):
+    """Возвращает карточки произведений в порядке списка id."""
+    cards = dict(
+        TitleCard.objects.filter(title_id__in=ids)
+        .values_list('title_id', 'data')
+    )
+    missing = [pk for pk in ids if pk not in cards]
+    if missing:
+        rebuild_title_cards(missing)
+        cards.update(
+            TitleCard.objects.filter(title_id__in=missing)
+            .values_list('title_id', 'data')
+        )
+    return RenderedFragments(cards[pk] for pk in ids if pk in cards)
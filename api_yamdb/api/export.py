@@ -0,0 +1,51 @@
+from collections import defaultdict
+
+from rest_framework.renderers import JSONRenderer
+
+from api.readers import ReviewValuesReader, TitleValuesReader
+from reviews.models import Review, Title
+
+EXPORT_BATCH_SIZE = 500
+
+
+def iter_titles(titles=None, with_reviews=False):
+    """Произведения в представлении TitleGETSerializer, пачками по id.
+
+    Каждая пачка выбирается условием по первичному ключу, поэтому память
+    не растёт с размером каталога. Отзывы пачки читаются одним запросом.
+    """
+    if titles is None:
+        titles = Title.objects.all()
+    title_reader = TitleValuesReader()
+    review_reader = ReviewValuesReader()
+    titles = title_reader.get_values(titles.order_by('pk'))
+    last_pk = 0
+    while True:
+        batch = list(titles.filter(pk__gt=last_pk)[:EXPORT_BATCH_SIZE])
+        if not batch:
+            return
+        last_pk = batch[-1]['id']
+        items = title_reader.read(batch)
+        if with_reviews:
+            reviews = defaultdict(list)
+            rows = review_reader.get_values(
+                Review.objects.filter(
+                    title_id__in=[item['id'] for item in items],
+                    author__is_deleted=False
+                ).order_by('-pub_date', '-id'),
+                'title_id'
+            )
+            for row in rows.iterator():
+                reviews[row['title_id']].append(
+                    review_reader.to_representation(row)
+                )
+            for item in items:
+                item['reviews'] = reviews[item['id']]
+        yield from items
+
+
+def iter_title_lines(titles=None, with_reviews=False):
+    """Строки NDJSON для выгрузки каталога."""
+    renderer = JSONRenderer()
+    for item in iter_titles(titles, with_reviews):
+        yield renderer.render(item) + b'\n'
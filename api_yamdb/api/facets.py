@@ -0,0 +1,263 @@
+from collections import Counter, defaultdict
+from threading import RLock
+
+from django.db.models import CharField, Count, F, Q, Value
+from django.db.models.functions import Cast
+
+from api.cache import get_versions
+from api.filters import GENRE_MATCH_ALL
+from reviews.models import Category, Genre, GenreTitle, Title
+
+FACET_CATEGORY = 'category'
+FACET_GENRE = 'genre'
+FACET_DECADE = 'decade'
+# Модели, по версиям которых индекс понимает, что устарел.
+FACET_INDEX_MODELS = (Title, GenreTitle, Category, Genre)
+
+
+class TitleRecord:
+    """Данные произведения, нужные фасетному индексу."""
+
+    __slots__ = ('sort_key', 'year', 'category_id', 'genres')
+
+    def __init__(self, title_id, name, year, category_id):
+        self.sort_key = (-year, name, title_id)
+        self.year = year
+        self.category_id = category_id
+        self.genres = Counter()
+
+
+def bit_string(bitmap):
+    """Строка битов карты: символ i равен '1', если бит i задан."""
+    return bin(bitmap)[:1:-1]
+
+
+class TitleFacetIndex:
+    """Битовые карты произведений по категориям, жанрам и годам.
+
+    Бит с номером id произведения задан в карте, если произведение
+    относится к категории, жанру или году. Фильтрация сводится к
+    пересечению карт, а из базы читается только страница результатов.
+
+    Индекс живёт в памяти процесса. Вместе с ним хранятся версии моделей
+    на момент загрузки: если другой процесс изменил данные, версии не
+    совпадут и индекс будет загружен заново.
+    """
+
+    def __init__(self):
+        self._lock = RLock()
+        self._loaded = False
+        self._versions = None
+
+    def clear(self, **kwargs):
+        with self._lock:
+            self._loaded = False
+
+    def _load(self, versions):
+        self._versions = versions
+        self._titles = {}
+        self._all = 0
+        self._categories = defaultdict(int)
+        self._genres = defaultdict(int)
+        self._years = defaultdict(int)
+        self._order = None
+        self._load_slugs()
+        for title_id, name, year, category_id in Title.objects.values_list(
+            'id', 'name', 'year', 'category_id'
+        ).iterator():
+            self._add_title(title_id, name, year, category_id)
+        for title_id, genre_id in GenreTitle.objects.values_list(
+            'title_id', 'genre_id'
+        ).iterator():
+            self._add_link(title_id, genre_id)
+        self._loaded = True
+
+    def _load_slugs(self):
+        self._category_slugs = dict(
+            Category.objects.values_list('slug', 'id')
+        )
+        self._genre_slugs = dict(Genre.objects.values_list('slug', 'id'))
+
+    def _add_title(self, title_id, name, year, category_id):
+        bit = 1 << title_id
+        self._titles[title_id] = TitleRecord(
+            title_id, name, year, category_id
+        )
+        self._all |= bit
+        self._years[year] |= bit
+        if category_id is not None:
+            self._categories[category_id] |= bit
+        self._order = None
+
+    def _remove_title(self, title_id):
+        record = self._titles.pop(title_id, None)
+        if record is None:
+            return None
+        mask = ~(1 << title_id)
+        self._all &= mask
+        self._years[record.year] &= mask
+        if record.category_id is not None:
+            self._categories[record.category_id] &= mask
+        for genre_id in record.genres:
+            self._genres[genre_id] &= mask
+        self._order = None
+        return record
+
+    def _add_link(self, title_id, genre_id):
+        record = self._titles.get(title_id)
+        if record is None:
+            return
+        record.genres[genre_id] += 1
+        self._genres[genre_id] |= 1 << title_id
+
+    def _remove_link(self, title_id, genre_id):
+        record = self._titles.get(title_id)
+        if record is None or not record.genres[genre_id]:
+            return
+        record.genres[genre_id] -= 1
+        if not record.genres[genre_id]:
+            del record.genres[genre_id]
+            self._genres[genre_id] &= ~(1 << title_id)
+
+    def update_title(self, title_id, name, year, category_id):
+        with self._lock:
+            if not self._loaded:
+                return
+            record = self._remove_title(title_id)
+            self._add_title(title_id, name, year, category_id)
+            if record is not None:
+                for genre_id, count in record.genres.items():
+                    for _ in range(count):
+                        self._add_link(title_id, genre_id)
+
+    def remove_title(self, title_id):
+        with self._lock:
+            if self._loaded:
+                self._remove_title(title_id)
+
+    def add_links(self, title_id, genre_ids):
+        with self._lock:
+            if self._loaded:
+                for genre_id in genre_ids:
+                    self._add_link(title_id, genre_id)
+
+    def remove_links(self, title_id, genre_ids):
+        with self._lock:
+            if self._loaded:
+                for genre_id in genre_ids:
+                    self._remove_link(title_id, genre_id)
+
+    def remove_category(self, category_id):
+        with self._lock:
+            if not self._loaded:
+                return
+            bits = bit_string(self._categories.pop(category_id, 0))
+            for title_id, bit in enumerate(bits):
+                if bit == '1' and title_id in self._titles:
+                    self._titles[title_id].category_id = None
+            self._load_slugs()
+
+    def refresh_slugs(self):
+        with self._lock:
+            if self._loaded:
+                self._load_slugs()
+
+    def _match_genres(self, slugs, match):
+        genre_ids = [self._genre_slugs.get(slug) for slug in slugs]
+        if match == GENRE_MATCH_ALL:
+            if None in genre_ids:
+                return 0
+            bitmap = self._all
+            for genre_id in genre_ids:
+                bitmap &= self._genres.get(genre_id, 0)
+            return bitmap
+        bitmap = 0
+        for genre_id in genre_ids:
+            if genre_id is not None:
+                bitmap |= self._genres.get(genre_id, 0)
+        return bitmap
+
+    def _match_years(self, year_min, year_max):
+        bitmap = 0
+        for year, bits in self._years.items():
+            if year_min is not None and year < year_min:
+                continue
+            if year_max is not None and year > year_max:
+                continue
+            bitmap |= bits
+        return bitmap
+
+    def filter(self, category=None, genres=None, genre_match=None,
+               year=None, year_min=None, year_max=None):
+        """Возвращает id подходящих произведений в порядке сортировки."""
+        versions = get_versions(FACET_INDEX_MODELS)
+        with self._lock:
+            if not self._loaded or versions != self._versions:
+                self._load(versions)
+            bitmap = self._all
+            if category:
+                bitmap &= self._categories.get(
+                    self._category_slugs.get(category), 0
+                )
+            if genres:
+                bitmap &= self._match_genres(genres, genre_match)
+            if year is not None:
+                bitmap &= self._years.get(year, 0)
+            if year_min is not None or year_max is not None:
+                bitmap &= self._match_years(year_min, year_max)
+            if self._order is None:
+                self._order = sorted(
+                    self._titles,
+                    key=lambda title_id: self._titles[title_id].sort_key
+                )
+            bits = bit_string(bitmap)
+            return [
+                title_id for title_id in self._order
+                if title_id < len(bits) and bits[title_id] == '1'
+            ]
+
+
+title_facet_index = TitleFacetIndex()
+
+
+def count_title_facets(titles):
+    """Число произведений по категориям, жанрам и десятилетиям.
+
+    Все три группировки выполняются одним запросом UNION ALL.
+    """
+    title_ids = titles.order_by().values('pk')
+    categories = Category.objects.order_by().annotate(
+        facet=Value(FACET_CATEGORY, output_field=CharField()),
+        key=F('slug'),
+        count=Count('titles', filter=Q(titles__in=title_ids), distinct=True),
+    ).values_list('facet', 'key', 'count')
+    genres = Genre.objects.order_by().annotate(
+        facet=Value(FACET_GENRE, output_field=CharField()),
+        key=F('slug'),
+        count=Count('titles', filter=Q(titles__in=title_ids), distinct=True),
+    ).values_list('facet', 'key', 'count')
+    decades = Title.objects.filter(pk__in=title_ids).order_by().annotate(
+        facet=Value(FACET_DECADE, output_field=CharField()),
+        key=Cast(F('year') / 10 * 10, output_field=CharField()),
+    ).values('facet', 'key').annotate(
+        count=Count('pk')
+    ).values_list('facet', 'key', 'count')
+
+    facets = {'categories': [], 'genres': [], 'years': []}
+    for facet, key, count in categories.union(genres, decades, all=True):
+        if facet == FACET_CATEGORY:
+            facets['categories'].append({'slug': key, 'count': count})
+        elif facet == FACET_GENRE:
+            facets['genres'].append({'slug': key, 'count': count})
+        else:
+            decade = int(key)
+            facets['years'].append({
+                'year_min': decade, 'year_max': decade + 9, 'count': count
+            })
+    for items, sort_key in (
+        (facets['categories'], 'slug'),
+        (facets['genres'], 'slug'),
+        (facets['years'], 'year_min'),
+    ):
+        items.sort(key=lambda item: item[sort_key])
+    return facets
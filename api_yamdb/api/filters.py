@@ -1,22 +1,111 @@
+from django import forms
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
 
-from reviews.models import Title
+from reviews.models import GenreTitle, Title
+from reviews.search import search_titles
+
+GENRE_MATCH_ANY = 'any'
+GENRE_MATCH_ALL = 'all'
+# Границы PositiveIntegerField: значения вне них SQLite не привяжет.
+YEAR_MIN_VALUE = 0
+YEAR_MAX_VALUE = 2147483647
+
+
+class YearFilter(rest_framework.NumberFilter):
+    """Целый год: дробные, NaN и огромные значения дают ошибку 400."""
+
+    field_class = forms.IntegerField
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('min_value', YEAR_MIN_VALUE)
+        kwargs.setdefault('max_value', YEAR_MAX_VALUE)
+        super().__init__(*args, **kwargs)
 
 
 class TitlesFilter(rest_framework.FilterSet):
     name = rest_framework.CharFilter(
         field_name='name',
         lookup_expr='icontains')
-    year = rest_framework.NumberFilter(
+    year = YearFilter(
+        field_name='year')
+    year_min = YearFilter(
+        field_name='year',
+        lookup_expr='gte')
+    year_max = YearFilter(
         field_name='year',
-        lookup_expr='contains')
+        lookup_expr='lte')
     category = rest_framework.CharFilter(
-        field_name='category__slug',
-        lookup_expr='contains')
-    genre = rest_framework.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='contains')
+        field_name='category__slug')
+    genre = rest_framework.CharFilter(method='filter_genre')
+    genre_match = rest_framework.ChoiceFilter(
+        choices=((GENRE_MATCH_ANY, 'Любой из жанров'),
+                 (GENRE_MATCH_ALL, 'Все жанры')),
+        method='filter_genre_match')
+    search = rest_framework.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ['name', 'year', 'category', 'genre']
+        fields = [
+            'name', 'year', 'year_min', 'year_max', 'category', 'genre',
+            'genre_match', 'search'
+        ]
+
+    def filter_genre(self, queryset, name, value):
+        """Жанры через запятую, проверка подзапросами EXISTS."""
+        slugs = {slug.strip() for slug in value.split(',') if slug.strip()}
+        if not slugs:
+            return queryset
+        links = GenreTitle.objects.filter(title=OuterRef('pk'))
+        if self.form.cleaned_data.get('genre_match') == GENRE_MATCH_ALL:
+            for slug in slugs:
+                queryset = queryset.filter(
+                    Exists(links.filter(genre__slug=slug))
+                )
+            return queryset
+        return queryset.filter(Exists(links.filter(genre__slug__in=slugs)))
+
+    def filter_genre_match(self, queryset, name, value):
+        """Режим сопоставления жанров учитывается в filter_genre."""
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию."""
+        return search_titles(queryset, value)
+
+
+class TitleOrderingFilter(BaseFilterBackend):
+    """Сортировка произведений по параметру `ordering`.
+
+    Допускаются только сортировки, которые обслуживаются индексом
+    (с id для однозначного порядка), остальные отклоняются.
+    """
+
+    ordering_param = 'ordering'
+    orderings = {
+        'name': ('name', 'id'),
+        'year': ('year', 'id'),
+        'rating': ('average_score', 'id'),
+        'review_count': ('review_count', 'id'),
+    }
+
+    def get_ordering(self, value):
+        descending = value.startswith('-')
+        fields = self.orderings.get(value.lstrip('-'))
+        if fields is None:
+            raise ValidationError({self.ordering_param: [
+                'Допустимые значения: '
+                + ', '.join(sorted(self.orderings))
+                + ' (с префиксом «-» для обратного порядка).'
+            ]})
+        if descending:
+            return tuple(f'-{field}' for field in fields)
+        return fields
+
+    def filter_queryset(self, request, queryset, view):
+        value = request.query_params.get(self.ordering_param)
+        if not value:
+            return queryset
+        return queryset.order_by(*self.get_ordering(value))
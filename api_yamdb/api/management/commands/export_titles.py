@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from api.export import iter_title_lines
+
+
+class Command(BaseCommand):
+    help = 'Выгружает каталог произведений в файл NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу выгрузки.')
+        parser.add_argument(
+            '--reviews', action='store_true',
+            help='Добавить к произведениям отзывы.'
+        )
+
+    def handle(self, *args, **options):
+        exported = 0
+        with open(options['path'], 'wb') as output:
+            for line in iter_title_lines(with_reviews=options['reviews']):
+                output.write(line)
+                exported += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Выгружено произведений: {exported}')
+        )
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.purge import PURGE_BATCH_SIZE, purge_deleted
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет помеченные на удаление произведения и пользователей '
+        'вместе с зависимыми строками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=PURGE_BATCH_SIZE,
+            help='Число строк, удаляемых одним запросом.'
+        )
+        parser.add_argument(
+            '--interval', type=float,
+            help='Работать постоянно, проверяя очередь с этим интервалом '
+                 'в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            titles, users = purge_deleted(options['batch_size'])
+            if titles or users:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Удалено произведений: {titles}, '
+                    f'пользователей: {users}'
+                ))
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.cards import rebuild_title_cards
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает карточки всех произведений.'
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_title_cards()
+        self.stdout.write(
+            self.style.SUCCESS(f'Перестроено карточек: {rebuilt}')
+        )
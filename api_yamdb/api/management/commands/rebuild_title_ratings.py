@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import bump_version
+from api.cards import rebuild_title_cards
+from reviews.models import Title
+from reviews.rankings import reconcile_title_rankings
+from reviews.stats import rebuild_title_ratings
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает агрегаты оценок произведений по отзывам, '
+        'а затем рейтинги и карточки.'
+    )
+
+    def handle(self, *args, **options):
+        title_ids = rebuild_title_ratings()
+        reconcile_title_rankings()
+        if title_ids:
+            rebuild_title_cards(title_ids)
+            bump_version(Title)
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено произведений: {len(title_ids)}')
+        )
@@ -1,12 +1,207 @@
-from rest_framework import mixins, viewsets
+import math
+from hashlib import md5
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework import mixins, status, viewsets
 from rest_framework.filters import SearchFilter
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
 
+from .cache import (
+    get_catalog_cache,
+    get_last_modified,
+    get_request_fingerprint,
+    get_response_key
+)
+from .cards import get_title_cards
+from .facets import title_facet_index
 from .permissions import (ReadOnly, IsSuperUserOrIsAdmin)
+from .serializers import get_requested_fields
+
+
+class CatalogCacheMixin:
+    """Кэширует ответы анонимным пользователям на чтение каталога.
+
+    Ключ включает версии моделей из `cache_models`, которые сдвигаются
+    сигналами при любом изменении, поэтому устаревшие ответы не отдаются.
+    """
+
+    cache_models = ()
+
+    def get_cached_response(self, handler, request, *args,
+                            anonymous_only=True, **kwargs):
+        if anonymous_only and request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        cache = get_catalog_cache()
+        key = get_response_key(request, self.cache_models)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class CatalogDetailCacheMixin(CatalogCacheMixin):
+    """Кэширует также ответы на запрос отдельного объекта."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """Условные GET-запросы по ETag и Last-Modified.
+
+    ETag строится из версий моделей `cache_models` и адреса запроса,
+    поэтому при совпадении If-None-Match ответ 304 отдаётся без выборки
+    и сериализации данных. Last-Modified только сообщается: с точностью
+    до секунды две записи в одну секунду неразличимы, и ответ 304 по
+    одному If-Modified-Since мог бы оказаться устаревшим.
+    """
+
+    cache_models = ()
+
+    def get_etag(self, request):
+        fingerprint = get_request_fingerprint(request, self.cache_models)
+        return quote_etag(md5(fingerprint.encode('utf-8')).hexdigest())
+
+    def get_last_modified(self, request):
+        return get_last_modified(self.cache_models)
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        last_modified = self.get_last_modified(request)
+        if last_modified is not None:
+            last_modified = math.ceil(last_modified)
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            return response
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ValuesListMixin:
+    """Список через `values_reader_class` вместо сериализатора.
+
+    Включается во вьюсете заданием класса чтения, ответ совпадает
+    с ответом сериализатора побайтно.
+    """
+
+    values_reader_class = None
+
+    def list(self, request, *args, **kwargs):
+        if self.values_reader_class is None:
+            return super().list(request, *args, **kwargs)
+        reader = self.values_reader_class(get_requested_fields(request))
+        queryset = reader.get_values(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(reader.read(queryset))
+        return self.get_paginated_response(reader.read(page))
+
+
+class TitleCardListMixin:
+    """Список произведений из готовых карточек без сериализации.
+
+    Если включён фасетный индекс и запрос содержит только его фильтры,
+    произведения отбираются в памяти, а из базы читаются лишь карточки
+    страницы.
+    """
+
+    facet_query_params = frozenset((
+        'category', 'genre', 'genre_match', 'year', 'year_min', 'year_max',
+        'page',
+    ))
+
+    def get_facet_title_ids(self, request):
+        if not settings.TITLE_FACET_INDEX_ENABLED:
+            return None
+        if not set(request.query_params) <= self.facet_query_params:
+            return None
+        filterset = self.filterset_class(
+            request.query_params, queryset=self.get_queryset()
+        )
+        if not filterset.is_valid():
+            return None
+        data = filterset.form.cleaned_data
+        years = {
+            name: data.get(name) for name in ('year', 'year_min', 'year_max')
+        }
+        genres = [
+            slug.strip() for slug in (data.get('genre') or '').split(',')
+            if slug.strip()
+        ]
+        return title_facet_index.filter(
+            category=data.get('category'),
+            genres=genres,
+            genre_match=data.get('genre_match'),
+            **years
+        )
+
+    @staticmethod
+    def get_ordering_fields(queryset):
+        """Поля модели, по которым сортируется и строится курсор.
+
+        Аннотации (например, релевантность поиска) выбираются и так.
+        """
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        names = (field.lstrip('-') for field in ordering)
+        return [
+            name for name in names
+            if name not in queryset.query.annotations
+        ]
+
+    def list(self, request, *args, **kwargs):
+        if get_requested_fields(request) is not None:
+            # Карточки содержат все поля, неполный ответ читается иначе.
+            return super().list(request, *args, **kwargs)
+        title_ids = self.get_facet_title_ids(request)
+        if title_ids is None:
+            queryset = self.filter_queryset(self.get_queryset())
+            titles = queryset.select_related(None).prefetch_related(
+                None
+            ).only('pk', *self.get_ordering_fields(queryset))
+            page = self.paginate_queryset(titles)
+            if page is not None:
+                page = [title.pk for title in page]
+            else:
+                title_ids = [title.pk for title in titles]
+        else:
+            page = self.paginate_queryset(title_ids)
+        if page is None:
+            return Response(get_title_cards(title_ids))
+        return self.get_paginated_response(get_title_cards(page))
 
 
-class CategoryGenreViewSet(mixins.ListModelMixin, mixins.CreateModelMixin,
-                           mixins.DestroyModelMixin, viewsets.GenericViewSet):
+class CategoryGenreViewSet(CatalogCacheMixin, mixins.ListModelMixin,
+                           mixins.CreateModelMixin, mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
 
     permission_classes = [ReadOnly | IsSuperUserOrIsAdmin]
     pagination_class = PageNumberPagination
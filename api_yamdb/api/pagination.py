@@ -0,0 +1,203 @@
+import json
+import math
+from base64 import b64decode, b64encode
+from datetime import date
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Курсорная пагинация по составному ключу сортировки.
+
+    Курсор хранит значения полей сортировки последнего объекта страницы,
+    следующая страница выбирается условием по ключу, без OFFSET и COUNT.
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+    page_size = api_settings.PAGE_SIZE
+    ordering = None
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+
+    def get_ordering(self, queryset):
+        if self.ordering:
+            return self.ordering
+        ordering = (
+            tuple(queryset.query.order_by)
+            or tuple(queryset.model._meta.ordering)
+        )
+        if 'id' not in ordering and '-id' not in ordering:
+            ordering += ('id',)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            position = self.clean_position(queryset, ordering, position)
+            queryset = queryset.filter(
+                self.get_keyset_filter(ordering, position)
+            )
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        self.ordering_fields = ordering
+        return self.page
+
+    def clean_position(self, queryset, ordering, position):
+        """Приводит значения курсора к типам полей сортировки.
+
+        Для аннотаций (например, релевантности поиска) берётся их
+        output_field. Значения вне диапазона поля (бесконечности, числа
+        больше 64 бит) отклоняются: база данных их не привяжет.
+        """
+        if len(position) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        annotations = queryset.query.annotations
+        cleaned = []
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            if name in annotations:
+                model_field = annotations[name].output_field
+            else:
+                model_field = queryset.model._meta.get_field(name)
+            try:
+                value = model_field.to_python(value)
+            except (DjangoValidationError, OverflowError, TypeError,
+                    ValueError):
+                raise NotFound(self.invalid_cursor_message)
+            if value is None or not self.in_field_range(
+                queryset.db, model_field, value
+            ):
+                raise NotFound(self.invalid_cursor_message)
+            cleaned.append(value)
+        return cleaned
+
+    @staticmethod
+    def in_field_range(using, model_field, value):
+        if isinstance(value, float):
+            return math.isfinite(value)
+        if not isinstance(value, int):
+            return True
+        # Для внешнего ключа диапазон задаёт поле, на которое он ссылается.
+        model_field = getattr(model_field, 'target_field', model_field)
+        value_range = connections[using].ops.integer_field_ranges.get(
+            model_field.get_internal_type()
+        )
+        if value_range is None:
+            return True
+        low, high = value_range
+        return low <= value <= high
+
+    @staticmethod
+    def get_keyset_filter(ordering, position):
+        """Условие «строго после позиции» для смешанных направлений.
+
+        Раскрытое OR-условие дополняется нестрогой границей по первому
+        полю: без неё планировщик не может начать просмотр индекса с
+        позиции курсора и сортирует все строки за ней.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        first, value = ordering[0], position[0]
+        bound = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{bound}': value}) & condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, instance):
+        position = []
+        for field in self.ordering_fields:
+            name = field.lstrip('-')
+            if isinstance(instance, dict):
+                value = instance[name]
+            else:
+                value = getattr(instance, name)
+            if isinstance(value, date):
+                value = value.isoformat()
+            position.append(value)
+        encoded = b64encode(json.dumps(position).encode('utf-8'))
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded.decode('ascii')
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+
+class OptionalKeysetPagination(PageNumberPagination):
+    """Постраничная пагинация с переходом на курсорную по запросу.
+
+    Курсорный режим включается параметром `cursor`, пустое значение
+    соответствует первой странице.
+    """
+
+    keyset_pagination_class = KeysetPagination
+    ordering = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        cursor_param = self.keyset_pagination_class.cursor_query_param
+        if cursor_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+        self.keyset = self.keyset_pagination_class(self.ordering)
+        return self.keyset.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class PubDateKeysetPagination(OptionalKeysetPagination):
+    """Пагинация лент отзывов и комментариев по (pub_date, id)."""
+
+    ordering = ('-pub_date', '-id')
+
+
+class TopRatedPagination(KeysetPagination):
+    """Курсорная пагинация топа по индексу ranking_bayesian_idx."""
+
+    ordering = ('-bayesian_rating', 'title')
+
+
+class TrendingPagination(KeysetPagination):
+    """Курсорная пагинация трендов по индексу ranking_trending_idx."""
+
+    ordering = ('-trending_score', 'title')
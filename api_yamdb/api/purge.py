@@ -0,0 +1,135 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from api.cache import bump_version
+from reviews.models import (
+    Comment, GenreTitle, Review, Title, TitleCard, TitleRanking,
+    TitleScoreCount, User
+)
+from reviews.rankings import (
+    get_ranking_state,
+    get_trending_weight,
+    shift_catalog_totals,
+    shift_trending_score
+)
+from reviews.signals import update_comment_count, update_title_rating
+from reviews.stats import update_score_count
+
+PURGE_BATCH_SIZE = 500
+
+
+def raw_delete(model, pks):
+    """Удаляет строки одним DELETE по id, без сборщика и сигналов."""
+    queryset = model._base_manager.filter(pk__in=pks)
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_in_batches(queryset, batch_size):
+    """Удаляет строки выборки пачками, каждая в своей транзакции."""
+    deleted = 0
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        with transaction.atomic():
+            deleted += raw_delete(queryset.model, pks)
+
+
+def purge_title(title_id, batch_size=PURGE_BATCH_SIZE):
+    """Удаляет помеченное произведение и всё, что от него зависит.
+
+    Агрегаты произведения не пересчитываются: оно уже скрыто. Его оценки
+    вычитаются из сумм каталога вместе с удалением строки.
+    """
+    for queryset in (
+        Comment.objects.filter(review__title_id=title_id),
+        Review.objects.filter(title_id=title_id),
+        GenreTitle.objects.filter(title_id=title_id),
+        TitleScoreCount.objects.filter(title_id=title_id),
+        TitleRanking.objects.filter(title_id=title_id),
+        TitleCard.objects.filter(title_id=title_id),
+    ):
+        delete_in_batches(queryset, batch_size)
+    # Зависимых строк не осталось, обычное удаление почти бесплатно.
+    titles = Title.all_objects.filter(pk=title_id)
+    with transaction.atomic():
+        totals = titles.values_list('score_sum', 'review_count').first()
+        if totals is not None and titles.delete()[0]:
+            shift_catalog_totals(-totals[0], -totals[1])
+
+
+def purge_user_comments(user_id, batch_size):
+    comments = Comment.objects.filter(author_id=user_id)
+    while True:
+        batch = list(
+            comments.values_list('pk', 'review_id')[:batch_size]
+        )
+        if not batch:
+            return
+        with transaction.atomic():
+            raw_delete(Comment, [pk for pk, _ in batch])
+            for review_id, count in Counter(
+                review_id for _, review_id in batch
+            ).items():
+                update_comment_count(review_id, -count)
+
+
+def purge_user_reviews(user_id, batch_size):
+    reviews = Review.objects.filter(author_id=user_id)
+    while True:
+        batch = list(reviews.values_list(
+            'pk', 'title_id', 'score', 'pub_date'
+        )[:batch_size])
+        if not batch:
+            return
+        review_ids = [pk for pk, *_ in batch]
+        delete_in_batches(
+            Comment.objects.filter(review_id__in=review_ids), batch_size
+        )
+        epoch = get_ranking_state().trending_epoch
+        totals = defaultdict(lambda: [0, 0, 0.0])
+        scores = Counter()
+        for _, title_id, score, pub_date in batch:
+            totals[title_id][0] += score
+            totals[title_id][1] += 1
+            totals[title_id][2] += get_trending_weight(pub_date, epoch)
+            scores[title_id, score] += 1
+        with transaction.atomic():
+            raw_delete(Review, review_ids)
+            for title_id, (score_sum, count, weight) in totals.items():
+                update_title_rating(title_id, -score_sum, -count)
+                shift_trending_score(title_id, -weight)
+            for (title_id, score), count in scores.items():
+                update_score_count(title_id, score, -count)
+
+
+def purge_user(user_id, batch_size=PURGE_BATCH_SIZE):
+    """Удаляет помеченного пользователя, его комментарии и отзывы.
+
+    Счётчики комментариев, агрегаты и рейтинги произведений сдвигаются
+    на вклад удалённых строк каждой пачки.
+    """
+    purge_user_comments(user_id, batch_size)
+    purge_user_reviews(user_id, batch_size)
+    User.all_objects.filter(pk=user_id, is_deleted=True).delete()
+
+
+def purge_deleted(batch_size=PURGE_BATCH_SIZE):
+    """Удаляет все помеченные произведения и пользователей."""
+    title_ids = list(
+        Title.all_objects.filter(is_deleted=True).values_list('pk', flat=True)
+    )
+    user_ids = list(
+        User.all_objects.filter(is_deleted=True).values_list(
+            'pk', flat=True
+        )
+    )
+    for title_id in title_ids:
+        purge_title(title_id, batch_size)
+    for user_id in user_ids:
+        purge_user(user_id, batch_size)
+    if title_ids or user_ids:
+        for model in (Title, GenreTitle, Review, Comment, User):
+            bump_version(model)
+    return len(title_ids), len(user_ids)
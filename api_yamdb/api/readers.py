@@ -0,0 +1,116 @@
+from collections import defaultdict
+
+from rest_framework import serializers
+
+from reviews.models import GenreTitle
+
+DATETIME_FIELD = serializers.DateTimeField()
+
+
+class ValuesReader:
+    """Чтение списков через `.values()` без полей DRF.
+
+    Строки выборки сразу превращаются в словари, совпадающие с ответом
+    сериализатора, а связанные объекты подтягиваются соединениями в SQL.
+    Ключи словаря идут в порядке полей сериализатора.
+    """
+
+    fields = ()
+    columns = {}
+
+    def __init__(self, fields=None):
+        self.fields = [
+            name for name in self.fields if fields is None or name in fields
+        ]
+
+    def get_values(self, queryset, *extra):
+        """Выборка `.values()` с колонками ответа и ключа сортировки."""
+        ordering = (
+            queryset.query.order_by or queryset.model._meta.ordering
+        )
+        columns = {'id', *extra}
+        columns.update(field.lstrip('-') for field in ordering)
+        for name in self.fields:
+            columns.update(self.columns.get(name, (name,)))
+        return queryset.select_related(None).prefetch_related(None).values(
+            *sorted(columns)
+        )
+
+    def read(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+    def to_representation(self, row):
+        return {name: self.get_value(name, row) for name in self.fields}
+
+    def get_value(self, name, row):
+        return row[name]
+
+
+class AuthoredValuesReader(ValuesReader):
+    """Отзывы и комментарии: автор по username, дата в формате DRF."""
+
+    columns = {'author': ('author__username',)}
+
+    def get_value(self, name, row):
+        if name == 'author':
+            return row['author__username']
+        if name == 'pub_date':
+            return DATETIME_FIELD.to_representation(row['pub_date'])
+        return row[name]
+
+
+class ReviewValuesReader(AuthoredValuesReader):
+    """Ответ, совпадающий с ReviewSerializer."""
+
+    fields = ('id', 'author', 'text', 'pub_date', 'score', 'comment_count')
+
+
+class CommentValuesReader(AuthoredValuesReader):
+    """Ответ, совпадающий с CommentSerializer."""
+
+    fields = ('id', 'author', 'text', 'pub_date')
+
+
+class TitleValuesReader(ValuesReader):
+    """Ответ, совпадающий с TitleGETSerializer.
+
+    Жанры страницы читаются одним дополнительным запросом.
+    """
+
+    fields = (
+        'id', 'category', 'genre', 'rating', 'name', 'year', 'description'
+    )
+    columns = {
+        'category': ('category__name', 'category__slug'),
+        'genre': (),
+        'rating': ('score_sum', 'review_count'),
+    }
+
+    def read(self, rows):
+        rows = list(rows)
+        self.genres = defaultdict(list)
+        if 'genre' in self.fields and rows:
+            links = GenreTitle.objects.filter(
+                title_id__in=[row['id'] for row in rows]
+            ).order_by('genre__name').values_list(
+                'title_id', 'genre__name', 'genre__slug'
+            )
+            for title_id, name, slug in links:
+                self.genres[title_id].append({'name': name, 'slug': slug})
+        return super().read(rows)
+
+    def get_value(self, name, row):
+        if name == 'category':
+            if row['category__slug'] is None:
+                return None
+            return {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            }
+        if name == 'genre':
+            return self.genres[row['id']]
+        if name == 'rating':
+            if not row['review_count']:
+                return None
+            return int(row['score_sum'] / row['review_count'])
+        return row[name]
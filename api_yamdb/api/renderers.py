@@ -0,0 +1,34 @@
+from rest_framework.renderers import JSONRenderer
+
+
+class RenderedFragments(list):
+    """Список уже отрендеренных JSON-фрагментов."""
+
+
+class FragmentJSONRenderer(JSONRenderer):
+    """JSONRenderer, вставляющий готовые фрагменты в ключ `results`."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not (isinstance(data, dict)
+                and isinstance(data.get('results'), RenderedFragments)):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        envelope = {key: value for key, value in data.items()
+                    if key != 'results'}
+        head = super().render(envelope, accepted_media_type, renderer_context)
+        results = b','.join(
+            fragment.encode('utf-8') for fragment in data['results']
+        )
+        separator = b',' if envelope else b''
+        return head[:-1] + separator + b'"results":[' + results + b']}'
+
+
+class NDJSONRenderer(JSONRenderer):
+    """JSON с разделением записей переводом строки."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(data) + b'\n'
@@ -1,17 +1,58 @@
-from rest_framework import serializers
+from collections import OrderedDict
+
+from django.db import router
+from django.db.models.signals import m2m_changed
+from rest_framework import permissions, serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
 from reviews.models import User
 from api.validators import validate_username
 from rest_framework.exceptions import ValidationError
+from rest_framework.validators import UniqueValidator
 import re
 from reviews.models import (
     Category,
     Genre,
+    GenreTitle,
     Title,
     Comment,
     Review
 )
 
 USERNAME_REGEX = r'^[\w.@+-]+\Z'
+DUPLICATE_REVIEW_MESSAGE = (
+    'Нельзя оставлять более одного отзыва на это произведение'
+)
+DELETED_USER_MESSAGE = 'Значение занято удалённым пользователем.'
+
+
+def get_requested_fields(request):
+    """Поля из параметров `fields` и `expand` GET-запроса или None.
+
+    `fields` задаёт набор полей ответа, `expand` добавляет к нему
+    вложенные объекты. Без `fields` ответ содержит все поля.
+    """
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return None
+    fields = request.query_params.get('fields')
+    if fields is None:
+        return None
+    requested = fields.split(',')
+    requested += request.query_params.get('expand', '').split(',')
+    return {field.strip() for field in requested if field.strip()}
+
+
+class SparseFieldsMixin:
+    """Оставляет в ответе только запрошенные поля."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = get_requested_fields(self.context.get('request'))
+        if requested is None:
+            return fields
+        return OrderedDict(
+            (name, field) for name, field in fields.items()
+            if name in requested
+        )
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -55,6 +96,14 @@ class SignupSerializer(serializers.ModelSerializer):
             raise ValidationError('Введите корректный username')
         return value
 
+    def validate(self, data):
+        """Имя и почта удалённого пользователя заняты до его очистки."""
+        deleted = User.all_objects.filter(is_deleted=True)
+        for field in ('username', 'email'):
+            if deleted.filter(**{field: data[field]}).exists():
+                raise ValidationError({field: [DELETED_USER_MESSAGE]})
+        return data
+
 
 class AdminUserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -62,7 +111,17 @@ class AdminUserSerializer(serializers.ModelSerializer):
         fields = (
             'username', 'email', 'first_name', 'last_name', 'bio', 'role',
         )
-        extra_kwargs = {'username': {'required': True}}
+        # Уникальность проверяется и среди удалённых пользователей,
+        # которых скрывает менеджер по умолчанию.
+        extra_kwargs = {
+            'username': {
+                'required': True,
+                'validators': [UniqueValidator(User.all_objects.all())],
+            },
+            'email': {
+                'validators': [UniqueValidator(User.all_objects.all())],
+            },
+        }
 
     def validate_username(self, value):
         """Проверка username на соответствие паттерну."""
@@ -95,7 +154,7 @@ class GenresSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class TitleGETSerializer(serializers.ModelSerializer):
+class TitleGETSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор объектов класса Title при GET запросах."""
 
     category = CategoriesSerializer(read_only=True)
@@ -104,7 +163,79 @@ class TitleGETSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = Title.AGGREGATE_FIELDS + ('is_deleted',)
+
+
+class ManySlugRelatedField(serializers.ManyRelatedField):
+    """Список слагов, разрешаемый одним запросом IN."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        field = self.child_relation
+        slugs = []
+        for slug in data:
+            if not isinstance(slug, str):
+                field.fail('invalid')
+            slugs.append(slug)
+        objects = {
+            getattr(obj, field.slug_field): obj
+            for obj in field.get_queryset().filter(
+                **{f'{field.slug_field}__in': slugs}
+            )
+        }
+        for slug in slugs:
+            if slug not in objects:
+                field.fail(
+                    'does_not_exist', slug_name=field.slug_field,
+                    value=slug
+                )
+        return [objects[slug] for slug in dict.fromkeys(slugs)]
+
+
+class BulkSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, который при many=True разрешает слаги разом."""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return ManySlugRelatedField(**list_kwargs)
+
+
+def set_title_genres(title, genres):
+    """Приводит жанры произведения к заданным по разнице связей.
+
+    Новые связи добавляются одной пакетной вставкой, лишние удаляются
+    одним запросом. Так как bulk_create не шлёт post_save, о
+    добавлении сообщается сигналом m2m_changed, как это делает
+    менеджер связи.
+    """
+    genre_ids = {genre.pk for genre in genres}
+    existing = set(
+        GenreTitle.objects.filter(title=title).values_list(
+            'genre_id', flat=True
+        )
+    )
+    removed = existing - genre_ids
+    if removed:
+        GenreTitle.objects.filter(
+            title=title, genre_id__in=removed
+        ).delete()
+    added = genre_ids - existing
+    if added:
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre_id=genre_id) for genre_id in added
+        )
+        m2m_changed.send(
+            sender=GenreTitle, action='post_add', instance=title,
+            reverse=False, model=Genre, pk_set=added,
+            using=router.db_for_write(GenreTitle, instance=title)
+        )
 
 
 class TitleSerializer(serializers.ModelSerializer):
@@ -114,7 +245,7 @@ class TitleSerializer(serializers.ModelSerializer):
         queryset=Category.objects.all(),
         slug_field='slug',
     )
-    genre = serializers.SlugRelatedField(
+    genre = BulkSlugRelatedField(
         queryset=Genre.objects.all(),
         slug_field='slug',
         many=True,
@@ -124,12 +255,28 @@ class TitleSerializer(serializers.ModelSerializer):
         model = Title
         fields = '__all__'
 
+    def create(self, validated_data):
+        genres = validated_data.pop('genre', [])
+        title = super().create(validated_data)
+        set_title_genres(title, genres)
+        return title
+
+    def update(self, title, validated_data):
+        genres = validated_data.pop('genre', None)
+        title = super().update(title, validated_data)
+        if genres is not None:
+            set_title_genres(title, genres)
+        return title
+
     def to_representation(self, title):
+        title = Title.objects.select_related(
+            'category'
+        ).prefetch_related('genre').get(pk=title.pk)
         serializer = TitleGETSerializer(title)
         return serializer.data
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для модели Review."""
 
     author = serializers.SlugRelatedField(
@@ -141,19 +288,8 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         exclude = ('title',)
 
-    def validate(self, data):
-        if self.context.get('request').method != 'POST':
-            return data
-        author = self.context.get('request').user
-        title_id = self.context.get('view').kwargs.get('title_id')
-        if Review.objects.filter(author=author, title=title_id).exists():
-            raise serializers.ValidationError(
-                'Нельзя оставлять более одного отзыва на это произведение'
-            )
-        return data
-
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор объектов класса Comment."""
 
     author = serializers.SlugRelatedField(
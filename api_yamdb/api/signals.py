@@ -0,0 +1,192 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_init, post_migrate, post_save,
+    pre_delete
+)
+from django.dispatch import receiver
+
+from api.autocomplete import title_prefix_index
+from api.cache import bump_version
+from api.cards import schedule_title_cards_rebuild
+from api.facets import title_facet_index
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, Review, Title, User
+)
+from reviews.signals import title_rating_changed
+
+VERSIONED_MODELS = (Title, GenreTitle, Category, Genre, Review, Comment)
+# Поля пользователя, которые видны в ответах каталога (автор отзывов и
+# комментариев). Остальные сохранения, например при входе, не меняют
+# версию User.
+USER_PUBLIC_FIELDS = ('username', 'is_deleted')
+
+
+def invalidate_versions(sender, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: bump_version(sender))
+
+
+def get_user_public_values(user):
+    # Отложенные поля не подгружаются: их значение не сравнивается.
+    return tuple(user.__dict__.get(name) for name in USER_PUBLIC_FIELDS)
+
+
+def remember_user_fields(sender, instance, **kwargs):
+    instance._original_public_values = get_user_public_values(instance)
+
+
+def invalidate_user_version(sender, instance, created=False, raw=False,
+                            **kwargs):
+    values = get_user_public_values(instance)
+    if not raw and not created and (
+        values != instance._original_public_values
+    ):
+        transaction.on_commit(lambda: bump_version(User))
+    instance._original_public_values = values
+
+
+def invalidate_genre_links(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(lambda: bump_version(GenreTitle))
+
+
+@receiver(post_save, sender=Title)
+def title_card_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_title_cards_rebuild([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_card_genres_changed(sender, instance, action, reverse, pk_set,
+                              **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            schedule_title_cards_rebuild([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        schedule_title_cards_rebuild(pk_set)
+    elif action == 'pre_clear':
+        schedule_title_cards_rebuild(
+            instance.titles.values_list('pk', flat=True)
+        )
+
+
+@receiver([post_save, post_delete], sender=GenreTitle)
+def title_card_genre_link_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_title_cards_rebuild([instance.title_id])
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+def title_card_relation_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_title_cards_rebuild(
+            instance.titles.values_list('pk', flat=True)
+        )
+
+
+@receiver(title_rating_changed)
+def title_card_rating_changed(sender, title_id, **kwargs):
+    schedule_title_cards_rebuild([title_id])
+
+
+@receiver(post_save, sender=Title)
+def title_prefix_saved(sender, instance, raw=False, **kwargs):
+    if instance.is_deleted:
+        title_prefix_deleted(sender, instance)
+    elif not raw:
+        title_id, name, year = instance.pk, instance.name, instance.year
+        transaction.on_commit(
+            lambda: title_prefix_index.update(title_id, name, year)
+        )
+
+
+@receiver(post_delete, sender=Title)
+def title_prefix_deleted(sender, instance, **kwargs):
+    title_id = instance.pk
+    transaction.on_commit(lambda: title_prefix_index.remove(title_id))
+
+
+@receiver(post_save, sender=Title)
+def title_facets_saved(sender, instance, raw=False, **kwargs):
+    if instance.is_deleted:
+        title_facets_deleted(sender, instance)
+    elif not raw:
+        values = (
+            instance.pk, instance.name, instance.year, instance.category_id
+        )
+        transaction.on_commit(lambda: title_facet_index.update_title(*values))
+
+
+@receiver(post_delete, sender=Title)
+def title_facets_deleted(sender, instance, **kwargs):
+    title_id = instance.pk
+    transaction.on_commit(lambda: title_facet_index.remove_title(title_id))
+
+
+@receiver(post_save, sender=GenreTitle)
+def genre_link_facets_saved(sender, instance, created, raw=False,
+                            **kwargs):
+    if created and not raw:
+        title_id, genre_id = instance.title_id, instance.genre_id
+        transaction.on_commit(
+            lambda: title_facet_index.add_links(title_id, [genre_id])
+        )
+
+
+@receiver(post_delete, sender=GenreTitle)
+def genre_link_facets_deleted(sender, instance, **kwargs):
+    # Удаление связей через remove()/clear() тоже приходит сюда.
+    title_id, genre_id = instance.title_id, instance.genre_id
+    transaction.on_commit(
+        lambda: title_facet_index.remove_links(title_id, [genre_id])
+    )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def genre_links_facets_added(sender, instance, action, reverse, pk_set,
+                             **kwargs):
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        links = [(title_id, [instance.pk]) for title_id in pk_set]
+    else:
+        links = [(instance.pk, list(pk_set))]
+
+    def add_links():
+        for title_id, genre_ids in links:
+            title_facet_index.add_links(title_id, genre_ids)
+
+    transaction.on_commit(add_links)
+
+
+@receiver([post_save, post_delete], sender=Genre)
+@receiver(post_save, sender=Category)
+def facet_slugs_changed(sender, **kwargs):
+    transaction.on_commit(title_facet_index.refresh_slugs)
+
+
+@receiver(post_delete, sender=Category)
+def category_facets_deleted(sender, instance, **kwargs):
+    category_id = instance.pk
+    transaction.on_commit(
+        lambda: title_facet_index.remove_category(category_id)
+    )
+
+
+# Версии сдвигаются после фиксации и после перестройки карточек: их
+# обработчики подключены последними, и on_commit вызывает функции в
+# порядке регистрации. Иначе параллельный запрос успел бы закэшировать
+# старый ответ под новой версией.
+for model in VERSIONED_MODELS:
+    post_save.connect(invalidate_versions, sender=model)
+    post_delete.connect(invalidate_versions, sender=model)
+m2m_changed.connect(invalidate_genre_links, sender=Title.genre.through)
+post_init.connect(remember_user_fields, sender=User)
+post_save.connect(invalidate_user_version, sender=User)
+post_delete.connect(invalidate_versions, sender=User)
+
+# После миграций и очистки базы индексы строятся заново.
+post_migrate.connect(title_prefix_index.clear)
+post_migrate.connect(title_facet_index.clear)
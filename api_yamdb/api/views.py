@@ -4,14 +4,23 @@ from django.conf import settings
 from rest_framework import viewsets, status, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import action, permission_classes, api_view
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.db.models import Avg
-from django.shortcuts import get_object_or_404
+from rest_framework.renderers import BrowsableAPIRenderer
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.http import StreamingHttpResponse
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.pagination import PageNumberPagination
-from reviews.models import Category, Genre, Title, Review, User
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, Title, TitleRanking, Review, User
+)
+from reviews.stats import get_title_stats
 from api.serializers import (
+    DUPLICATE_REVIEW_MESSAGE,
+    get_requested_fields,
     TokenSerializer,
     SignupSerializer,
     AdminUserSerializer,
@@ -28,8 +37,43 @@ from api.permissions import (
     IsSuperUserIsAdminIsModeratorIsAuthor,
     IsSuperUserOrIsAdmin
 )
-from api.mixin import CategoryGenreViewSet
-from api.filters import TitlesFilter
+from api.mixin import (
+    CatalogDetailCacheMixin,
+    CategoryGenreViewSet,
+    ConditionalGetMixin,
+    TitleCardListMixin,
+    ValuesListMixin
+)
+from api.autocomplete import title_prefix_index
+from api.cache import max_timestamp
+from api.bulk import TitleBulkWriter
+from api.cards import get_title_cards
+from api.export import iter_title_lines
+from api.facets import count_title_facets
+from api.filters import TitleOrderingFilter, TitlesFilter
+from api.readers import (
+    CommentValuesReader,
+    ReviewValuesReader,
+    TitleValuesReader
+)
+from api.renderers import FragmentJSONRenderer, NDJSONRenderer
+from api.pagination import (
+    OptionalKeysetPagination,
+    PubDateKeysetPagination,
+    TopRatedPagination,
+    TrendingPagination
+)
+
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+
+def with_author(queryset, request):
+    """Подгружает авторов, если поле `author` есть в ответе."""
+    fields = get_requested_fields(request)
+    if fields is None or 'author' in fields:
+        return queryset.select_related('author')
+    return queryset
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -49,6 +93,11 @@ class UserViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(username__icontains=search_query)
         return queryset
 
+    def perform_destroy(self, user):
+        # Отзывы и комментарии удаляет фоновая очистка purge_deleted.
+        user.is_deleted = True
+        user.save(update_fields=['is_deleted'])
+
     @action(methods=['GET', 'PATCH'], detail=False,
             url_path='me', permission_classes=[IsAuthenticated])
     def me(self, request):
@@ -135,6 +184,7 @@ class CategoryViewSet(CategoryGenreViewSet):
 
     queryset = Category.objects.all()
     serializer_class = CategoriesSerializer
+    cache_models = (Category,)
 
 
 class GenreViewSet(CategoryGenreViewSet):
@@ -142,62 +192,252 @@ class GenreViewSet(CategoryGenreViewSet):
 
     queryset = Genre.objects.all()
     serializer_class = GenresSerializer
+    cache_models = (Genre,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, CatalogDetailCacheMixin,
+                   TitleCardListMixin, ValuesListMixin,
+                   viewsets.ModelViewSet):
     """Вьюсет для модели Title."""
 
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     permission_classes = (ReadOnly | IsSuperUserOrIsAdmin,)
-    pagination_class = PageNumberPagination
-    filter_backends = (DjangoFilterBackend,)
+    pagination_class = OptionalKeysetPagination
+    renderer_classes = (FragmentJSONRenderer, BrowsableAPIRenderer)
+    filter_backends = (DjangoFilterBackend, TitleOrderingFilter)
     filterset_class = TitlesFilter
     http_method_names = ['get', 'head', 'options', 'post', 'delete', 'patch']
+    cache_models = (Title, GenreTitle, Category, Genre, Review)
+    values_reader_class = TitleValuesReader
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = get_requested_fields(self.request)
+        if fields is None:
+            return queryset
+        if 'category' not in fields:
+            queryset = queryset.select_related(None)
+        if 'genre' not in fields:
+            queryset = queryset.prefetch_related(None)
+        if 'description' not in fields:
+            queryset = queryset.defer('description')
+        return queryset
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return TitleGETSerializer
         return TitleSerializer
 
+    def perform_destroy(self, title):
+        # Произведение сразу скрывается, а отзывы, комментарии и связи
+        # удаляет фоновая очистка purge_deleted.
+        title.is_deleted = True
+        title.save(update_fields=['is_deleted'])
+
+    @action(methods=['GET'], detail=False, url_path='top',
+            pagination_class=TopRatedPagination)
+    def top(self, request):
+        """Произведения по байесовскому рейтингу."""
+        return self.get_ranking_response(
+            TitleRanking.objects.filter(bayesian_rating__isnull=False)
+        )
+
+    @action(methods=['GET'], detail=False, url_path='trending',
+            pagination_class=TrendingPagination)
+    def trending(self, request):
+        """Произведения по затухающей со временем активности отзывов."""
+        return self.get_ranking_response(
+            TitleRanking.objects.filter(trending_score__gt=0)
+        )
+
+    def get_ranking_response(self, rankings):
+        # Курсор строится по полям сортировки, последнее из них — title.
+        page = self.paginate_queryset(rankings.values(*(
+            field.lstrip('-') for field in self.paginator.ordering
+        )))
+        return self.get_paginated_response(
+            get_title_cards([ranking['title'] for ranking in page])
+        )
+
+    @action(methods=['GET'], detail=False, url_path='facets')
+    def facets(self, request):
+        """Количество произведений по категориям, жанрам и десятилетиям."""
+        return self.get_cached_response(
+            self.get_facets_response, request, anonymous_only=False
+        )
+
+    def get_facets_response(self, request):
+        titles = self.filter_queryset(Title.objects.all())
+        return Response(count_title_facets(titles))
+
+    @action(methods=['GET'], detail=False, url_path='export',
+            renderer_classes=(NDJSONRenderer,))
+    def export(self, request):
+        """Выгрузка каталога в NDJSON, по произведению в строке."""
+        titles = self.filter_queryset(Title.objects.all())
+        with_reviews = request.query_params.get('reviews', '').lower() in (
+            '1', 'true', 'yes'
+        )
+        return StreamingHttpResponse(
+            iter_title_lines(titles, with_reviews),
+            content_type=NDJSONRenderer.media_type
+        )
+
+    @action(methods=['POST'], detail=False, url_path='bulk',
+            permission_classes=(IsSuperUserOrIsAdmin,))
+    def bulk(self, request):
+        """Создание и изменение пакета произведений одним запросом."""
+        writer = TitleBulkWriter(request.data)
+        writer.validate()
+        title_ids = writer.save()
+        reader = TitleValuesReader()
+        titles = {
+            item['id']: item for item in reader.read(
+                reader.get_values(Title.objects.filter(pk__in=title_ids))
+            )
+        }
+        return Response(
+            [titles[title_id] for title_id in title_ids],
+            status=status.HTTP_200_OK
+        )
+
+    @action(methods=['GET'], detail=True, url_path='stats')
+    def stats(self, request, pk=None):
+        """Число отзывов, средняя оценка и распределение оценок."""
+        return self.get_cached_response(self.get_stats_response, request, pk)
+
+    def get_stats_response(self, request, pk):
+        stats = get_title_stats(pk)
+        if stats is None:
+            raise NotFound()
+        return Response(stats)
+
+    @action(methods=['GET'], detail=False, url_path='autocomplete')
+    def autocomplete(self, request):
+        """Подсказки по началу слов в названиях произведений."""
+        try:
+            limit = min(
+                int(request.query_params.get('limit', AUTOCOMPLETE_LIMIT)),
+                AUTOCOMPLETE_MAX_LIMIT
+            )
+        except ValueError:
+            limit = AUTOCOMPLETE_LIMIT
+        query = request.query_params.get('q', '')
+        return Response(title_prefix_index.search(query, max(limit, 1)))
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, ValuesListMixin,
+                    viewsets.ModelViewSet):
     """Вьюсет для модели Review."""
 
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         IsSuperUserIsAdminIsModeratorIsAuthor
     )
-    pagination_class = PageNumberPagination
+    pagination_class = PubDateKeysetPagination
     serializer_class = ReviewSerializer
     http_method_names = ['get', 'head', 'options', 'post', 'delete', 'patch']
+    cache_models = (Title, Review, Comment, User)
+    values_reader_class = ReviewValuesReader
 
-    def get_title(self):
+    @cached_property
+    def title_id(self):
+        """id произведения из адреса, проверенный один раз за запрос."""
         title_id = self.kwargs.get('title_id')
-        return get_object_or_404(Title, id=title_id)
+        if not Title.objects.filter(pk=title_id).exists():
+            raise NotFound()
+        return title_id
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        # Отзывы удалённых пользователей скрыты до фоновой очистки.
+        return with_author(
+            Review.objects.filter(
+                title_id=self.title_id, author__is_deleted=False
+            ), self.request
+        )
+
+    def get_last_modified(self, request):
+        last_pub_date = Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ).aggregate(last=Max('pub_date'))['last']
+        return max_timestamp(
+            super().get_last_modified(request), last_pub_date
+        )
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        # Повторный отзыв отсекает ограничение unique_author_title, а
+        # агрегаты произведения сигналы обновляют в той же транзакции.
+        # Произведение проверяется до неё: транзакция SQLite, начатая с
+        # чтения, не дожидается блокировки на запись.
+        # Другие нарушения целостности не выдаются за повторный отзыв:
+        # после отката проверяется, что отзыв автора уже есть.
+        title_id = self.title_id
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title_id=title_id)
+        except IntegrityError:
+            if not Review.objects.filter(
+                author=self.request.user, title_id=title_id
+            ).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_REVIEW_MESSAGE]
+            })
+
+    def perform_update(self, serializer):
+        # Сигналы перечитывают оценку под блокировкой строки, поэтому
+        # сохранение и сдвиг агрегатов идут в одной транзакции.
+        with transaction.atomic():
+            serializer.save()
 
+    def perform_destroy(self, review):
+        with transaction.atomic():
+            review.delete()
 
-class CommentViewSet(viewsets.ModelViewSet):
+
+class CommentViewSet(ConditionalGetMixin, ValuesListMixin,
+                     viewsets.ModelViewSet):
     """Вьюсет для модели Comment."""
 
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         IsSuperUserIsAdminIsModeratorIsAuthor
     )
-    pagination_class = PageNumberPagination
+    pagination_class = PubDateKeysetPagination
     serializer_class = CommentSerializer
     http_method_names = ['get', 'head', 'options', 'post', 'delete', 'patch']
-
-    def get_review(self):
-        return get_object_or_404(Review, pk=self.kwargs.get('review_id'))
+    cache_models = (Review, Comment, User)
+    values_reader_class = CommentValuesReader
+
+    @cached_property
+    def review_id(self):
+        """id отзыва из адреса; отзыв должен относиться к произведению."""
+        review_id = self.kwargs.get('review_id')
+        if not Review.objects.filter(
+            pk=review_id, title_id=self.kwargs.get('title_id'),
+            title__is_deleted=False, author__is_deleted=False
+        ).exists():
+            raise NotFound()
+        return review_id
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return with_author(
+            Comment.objects.filter(
+                review_id=self.review_id, author__is_deleted=False
+            ), self.request
+        )
+
+    def get_last_modified(self, request):
+        last_pub_date = Comment.objects.filter(
+            review_id=self.kwargs.get('review_id')
+        ).aggregate(last=Max('pub_date'))['last']
+        return max_timestamp(
+            super().get_last_modified(request), last_pub_date
+        )
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.get_review())
+        serializer.save(
+            author=self.request.user, review_id=self.review_id
+        )
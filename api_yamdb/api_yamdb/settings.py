@@ -67,6 +67,25 @@ DATABASES = {
 }
 
 
+# Cache
+# Для локальной проверки можно указать файловый бэкенд:
+# 'django.core.cache.backends.filebased.FileBasedCache' с LOCATION.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Кэш ответов каталога для анонимных пользователей.
+CATALOG_CACHE_ALIAS = 'default'
+CATALOG_CACHE_TIMEOUT = 60 * 5
+
+# Фасетный индекс произведений в памяти процесса для фильтров
+# по категории, жанрам и годам.
+TITLE_FACET_INDEX_ENABLED = False
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Min
+
+from reviews.models import GenreTitle
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет повторяющиеся связи произведений с жанрами и добавляет '
+        'уникальное ограничение и обратный индекс, если их нет.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            kept = GenreTitle.objects.values(
+                'title', 'genre'
+            ).annotate(keep=Min('pk')).values('keep')
+            deleted, _ = GenreTitle.objects.exclude(pk__in=kept).delete()
+        # Редактор схемы SQLite нельзя открывать внутри транзакции.
+        self.add_missing_constraints()
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено повторов: {deleted}')
+        )
+
+    @staticmethod
+    def get_existing_constraints():
+        with connection.cursor() as cursor:
+            return connection.introspection.get_constraints(
+                cursor, GenreTitle._meta.db_table
+            )
+
+    def add_missing_constraints(self):
+        meta = GenreTitle._meta
+        with connection.schema_editor() as editor:
+            existing = self.get_existing_constraints()
+            for constraint in meta.constraints:
+                if constraint.name not in existing:
+                    editor.add_constraint(GenreTitle, constraint)
+        # На SQLite ограничение добавляется пересозданием таблицы вместе
+        # с индексами модели, поэтому индексы проверяются заново.
+        with connection.schema_editor() as editor:
+            existing = self.get_existing_constraints()
+            for index in meta.indexes:
+                if index.name not in existing:
+                    editor.add_index(GenreTitle, index)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from reviews.stats import rebuild_title_score_counts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает распределение оценок по произведениям.'
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_title_score_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано счётчиков: {rebuilt}')
+        )
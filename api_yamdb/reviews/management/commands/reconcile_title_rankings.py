@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from reviews.rankings import reconcile_title_rankings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинги для топа и трендов произведений.'
+
+    def handle(self, *args, **options):
+        reconciled = reconcile_title_rankings()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано произведений: {reconciled}')
+        )
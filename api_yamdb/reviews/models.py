@@ -1,5 +1,5 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.core.validators import (
     MaxValueValidator,
     MinValueValidator,
@@ -24,6 +24,21 @@ class UserRole:
     ]
 
 
+class LiveManagerMixin:
+    """Менеджер без строк, помеченных на удаление."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
+class LiveManager(LiveManagerMixin, models.Manager):
+    pass
+
+
+class LiveUserManager(LiveManagerMixin, UserManager):
+    pass
+
+
 class User(AbstractUser):
     """Модель пользователя."""
 
@@ -66,12 +81,29 @@ class User(AbstractUser):
         choices=UserRole.CHOICES,
         default=UserRole.USER,
     )
+    # Удалённый пользователь сразу скрывается менеджером objects и не
+    # может войти, а его отзывы и комментарии удаляет фоновая очистка.
+    is_deleted = models.BooleanField(
+        verbose_name='Удалён',
+        default=False,
+        editable=False,
+    )
+
+    objects = LiveUserManager()
+    all_objects = UserManager()
 
     class Meta:
 
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
         ordering = ['username']
+        indexes = (
+            models.Index(
+                fields=('id',),
+                name='user_deleted_idx',
+                condition=models.Q(is_deleted=True),
+            ),
+        )
 
     def __str__(self):
         return self.username
@@ -131,7 +163,30 @@ class Genre(models.Model):
         return self.name[:MAX_LENGHT]
 
 
-class Title(models.Model):
+class AggregatesModel(models.Model):
+    """Модель с полями-агрегатами, которые меняются только сигналами.
+
+    При сохранении изменённого объекта поля AGGREGATE_FIELDS не пишутся,
+    чтобы не затереть их устаревшими значениями экземпляра.
+    """
+
+    AGGREGATE_FIELDS = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        """Не перезаписывать агрегаты устаревшими значениями экземпляра."""
+        if not self._state.adding and not kwargs.get('update_fields'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.AGGREGATE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+
+class Title(AggregatesModel):
     """Модель для произведений."""
 
     name = models.CharField(
@@ -170,28 +225,216 @@ class Title(models.Model):
         related_name='titles',
         null=True
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False,
+        db_index=True,
+    )
+    average_score = models.FloatField(
+        verbose_name='Средняя оценка',
+        default=0,
+        editable=False,
+        db_index=True,
+    )
+    # Удалённое произведение сразу скрывается менеджером objects,
+    # а зависимые строки удаляет фоновая очистка.
+    is_deleted = models.BooleanField(
+        verbose_name='Удалено',
+        default=False,
+        editable=False,
+    )
+
+    objects = LiveManager()
+    all_objects = models.Manager()
+
+    # Поля агрегатов обновляются только сигналами модели Review.
+    AGGREGATE_FIELDS = ('score_sum', 'review_count', 'average_score')
 
     class Meta:
 
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('-year', 'name')
+        indexes = (
+            models.Index(
+                fields=('-year', 'name', 'id'),
+                name='title_year_name_id_idx',
+            ),
+            models.Index(
+                fields=('name',),
+                name='title_name_idx',
+            ),
+            models.Index(
+                fields=('id',),
+                name='title_deleted_idx',
+                condition=models.Q(is_deleted=True),
+            ),
+        )
 
     def __str__(self):
         return self.name[:MAX_LENGHT]
 
+    @property
+    def rating(self):
+        """Средняя оценка по отзывам, если отзывов нет — None."""
+        if not self.review_count:
+            return None
+        return self.score_sum / self.review_count
+
+
+class TitleCard(models.Model):
+    """Готовое JSON-представление произведения для списка."""
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='card',
+        verbose_name='Произведение'
+    )
+    data = models.TextField(
+        verbose_name='Представление'
+    )
+
+    class Meta:
+
+        verbose_name = 'Карточка произведения'
+        verbose_name_plural = 'Карточки произведений'
+
+    def __str__(self):
+        return str(self.title)
+
+
+class TitleRanking(models.Model):
+    """Рейтинги произведения для топа и трендов."""
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='ranking',
+        verbose_name='Произведение'
+    )
+    bayesian_rating = models.FloatField(
+        verbose_name='Взвешенный рейтинг',
+        null=True,
+    )
+    trending_score = models.FloatField(
+        verbose_name='Популярность',
+        default=0,
+    )
+
+    class Meta:
+
+        verbose_name = 'Рейтинг произведения'
+        verbose_name_plural = 'Рейтинги произведений'
+        indexes = (
+            models.Index(
+                fields=('-bayesian_rating', 'title'),
+                name='ranking_bayesian_idx',
+            ),
+            models.Index(
+                fields=('-trending_score', 'title'),
+                name='ranking_trending_idx',
+            ),
+        )
+
+    def __str__(self):
+        return str(self.title)
+
+
+class RankingState(models.Model):
+    """Общие для всего каталога величины рейтингов (одна строка)."""
+
+    score_sum = models.PositiveBigIntegerField(
+        verbose_name='Сумма оценок каталога',
+        default=0,
+    )
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов каталога',
+        default=0,
+    )
+    trending_epoch = models.DateTimeField(
+        verbose_name='Начало отсчёта весов популярности',
+    )
+
+    class Meta:
+
+        verbose_name = 'Состояние рейтингов'
+        verbose_name_plural = 'Состояние рейтингов'
+
+    def __str__(self):
+        return f'{self.score_sum}/{self.review_count}'
+
+
+class TitleScoreCount(models.Model):
+    """Число отзывов произведения с данной оценкой."""
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='score_counts',
+        verbose_name='Произведение'
+    )
+    score = models.PositiveSmallIntegerField(
+        verbose_name='Оценка'
+    )
+    count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+    )
+
+    class Meta:
+
+        verbose_name = 'Число оценок произведения'
+        verbose_name_plural = 'Числа оценок произведений'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('title', 'score'),
+                name='unique_title_score'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.title} {self.score}'
+
 
 class GenreTitle(models.Model):
     """Модель жанров."""
 
-    genre = models.ForeignKey('Genre', on_delete=models.CASCADE)
-    title = models.ForeignKey('Title', on_delete=models.CASCADE)
+    # Отдельные индексы внешних ключей не нужны: их покрывают составные.
+    genre = models.ForeignKey(
+        'Genre', on_delete=models.CASCADE, db_index=False
+    )
+    title = models.ForeignKey(
+        'Title', on_delete=models.CASCADE, db_index=False
+    )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('title', 'genre'),
+                name='unique_title_genre'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('genre', 'title'),
+                name='genretitle_genre_title_idx',
+            ),
+        )
 
     def __str__(self):
         return f'{self.title} {self.genre}'
 
 
-class Review(models.Model):
+class Review(AggregatesModel):
     """Модель для отзывов."""
 
     title = models.ForeignKey(
@@ -220,6 +463,14 @@ class Review(models.Model):
             MinValueValidator(1, 'Оценка не может быть меньше 1'),
         ]
     )
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False,
+    )
+
+    # Число комментариев обновляется только сигналами модели Comment.
+    AGGREGATE_FIELDS = ('comment_count',)
 
     class Meta:
 
@@ -232,6 +483,12 @@ class Review(models.Model):
                 name='unique_author_title'
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('title', '-pub_date', '-id'),
+                name='review_title_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:MAX_LENGHT]
@@ -264,6 +521,12 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('review', '-pub_date', '-id'),
+                name='comment_review_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:MAX_LENGHT]
@@ -0,0 +1,180 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from django.db import transaction
+from django.db.models import Case, Exists, F, OuterRef, Sum, Value, When
+from django.db.models.functions import Greatest
+
+from reviews.models import RankingState, Review, Title, TitleRanking
+
+# Вес априорного среднего в байесовском рейтинге (число «виртуальных»
+# отзывов со средней оценкой по каталогу).
+BAYESIAN_PRIOR_WEIGHT = 5
+# Вклад отзыва в популярность убывает вдвое за период полураспада.
+# Веса отсчитываются от общей эпохи, поэтому сумма весов упорядочивает
+# произведения так же, как затухающая сумма на любой момент. Когда
+# отзыв оказывается дальше TRENDING_MAX_HALF_LIVES периодов от эпохи,
+# эпоха переносится, а популярность всех произведений масштабируется:
+# иначе веса переполнили бы float.
+TRENDING_HALF_LIFE = timedelta(days=7)
+TRENDING_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+TRENDING_MAX_HALF_LIVES = 256
+RECONCILE_BATCH_SIZE = 500
+RANKING_STATE_PK = 1
+
+
+def get_catalog_totals():
+    """Сумма оценок и число отзывов всех произведений, включая
+    помеченные на удаление."""
+    totals = Title.all_objects.aggregate(
+        score_sum=Sum('score_sum'), review_count=Sum('review_count')
+    )
+    return totals['score_sum'] or 0, totals['review_count'] or 0
+
+
+def get_ranking_state():
+    """Строка состояния рейтингов, при первом обращении — по каталогу."""
+    try:
+        return RankingState.objects.get(pk=RANKING_STATE_PK)
+    except RankingState.DoesNotExist:
+        score_sum, review_count = get_catalog_totals()
+        state, _ = RankingState.objects.get_or_create(
+            pk=RANKING_STATE_PK, defaults={
+                'score_sum': score_sum,
+                'review_count': review_count,
+                'trending_epoch': TRENDING_EPOCH,
+            }
+        )
+        return state
+
+
+def shift_catalog_totals(score_delta, count_delta):
+    """Сдвигает суммы каталога; вызывается после агрегатов произведения."""
+    if not RankingState.objects.filter(pk=RANKING_STATE_PK).update(
+        score_sum=F('score_sum') + score_delta,
+        review_count=F('review_count') + count_delta,
+    ):
+        get_ranking_state()
+
+
+def get_catalog_mean():
+    """Средняя оценка по всем отзывам каталога или None."""
+    state = get_ranking_state()
+    if not state.review_count:
+        return None
+    return state.score_sum / state.review_count
+
+
+def get_bayesian_rating(score_sum, review_count, mean):
+    if not review_count or mean is None:
+        return None
+    return (
+        (score_sum + BAYESIAN_PRIOR_WEIGHT * mean)
+        / (review_count + BAYESIAN_PRIOR_WEIGHT)
+    )
+
+
+def get_trending_weight(pub_date, epoch):
+    return 2 ** ((pub_date - epoch) / TRENDING_HALF_LIFE)
+
+
+def move_trending_epoch(epoch):
+    """Переносит эпоху весов и пересчитывает популярность под неё."""
+    with transaction.atomic():
+        state = RankingState.objects.select_for_update().get(
+            pk=RANKING_STATE_PK
+        )
+        TitleRanking.objects.update(
+            trending_score=F('trending_score') * get_trending_weight(
+                state.trending_epoch, epoch
+            )
+        )
+        state.trending_epoch = epoch
+        state.save(update_fields=['trending_epoch'])
+    return epoch
+
+
+def update_bayesian_rating(title_id):
+    """Пересчитывает взвешенный рейтинг одного произведения."""
+    title = Title.objects.filter(pk=title_id).values(
+        'score_sum', 'review_count'
+    ).first()
+    if title is None:
+        return
+    TitleRanking.objects.filter(title_id=title_id).update(
+        bayesian_rating=get_bayesian_rating(
+            title['score_sum'], title['review_count'], get_catalog_mean()
+        )
+    )
+
+
+def update_trending_score(title_id, pub_date, sign):
+    """Добавляет (sign=1) или вычитает (sign=-1) вклад отзыва."""
+    epoch = get_ranking_state().trending_epoch
+    if (pub_date - epoch) / TRENDING_HALF_LIFE > TRENDING_MAX_HALF_LIVES:
+        epoch = move_trending_epoch(pub_date)
+    shift_trending_score(
+        title_id, sign * get_trending_weight(pub_date, epoch)
+    )
+
+
+def shift_trending_score(title_id, delta):
+    """Сдвигает популярность; без отзывов она обнуляется.
+
+    Вычитание весов оставляет погрешность float, из-за которой
+    произведение без отзывов осталось бы в трендах.
+    """
+    TitleRanking.objects.filter(title_id=title_id).update(
+        trending_score=Case(
+            When(
+                Exists(Review.objects.filter(title_id=OuterRef('title_id'))),
+                then=Greatest(F('trending_score') + delta, Value(0.0)),
+            ),
+            default=Value(0.0),
+        )
+    )
+
+
+def ensure_title_ranking(title_id):
+    TitleRanking.objects.get_or_create(title_id=title_id)
+
+
+def reconcile_title_rankings():
+    """Полностью пересчитывает рейтинги всех произведений.
+
+    Суммы каталога пересчитываются заново, а эпоха весов популярности
+    переносится на текущий момент.
+    """
+    with transaction.atomic():
+        score_sum, review_count = get_catalog_totals()
+        epoch = datetime.now(timezone.utc)
+        RankingState.objects.update_or_create(
+            pk=RANKING_STATE_PK, defaults={
+                'score_sum': score_sum,
+                'review_count': review_count,
+                'trending_epoch': epoch,
+            }
+        )
+        mean = get_catalog_mean()
+        trending = defaultdict(float)
+        for title_id, pub_date in Review.objects.values_list(
+            'title_id', 'pub_date'
+        ).iterator():
+            trending[title_id] += get_trending_weight(pub_date, epoch)
+        rankings = [
+            TitleRanking(
+                title_id=title_id,
+                bayesian_rating=get_bayesian_rating(
+                    score_sum, review_count, mean
+                ),
+                trending_score=trending[title_id],
+            )
+            for title_id, score_sum, review_count in Title.objects.values_list(
+                'pk', 'score_sum', 'review_count'
+            ).iterator()
+        ]
+        TitleRanking.objects.all().delete()
+        TitleRanking.objects.bulk_create(
+            rankings, batch_size=RECONCILE_BATCH_SIZE
+        )
+    return len(rankings)
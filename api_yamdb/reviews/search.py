@@ -0,0 +1,100 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from reviews.models import Title
+
+TITLE_TABLE = Title._meta.db_table
+SEARCH_TABLE = f'{TITLE_TABLE}_fts'
+
+# Внешний FTS5-индекс по названию и описанию произведений. Триггеры
+# поддерживают его в актуальном состоянии при любых изменениях таблицы.
+CREATE_SEARCH_INDEX = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        name, description,
+        content='{TITLE_TABLE}', content_rowid='id',
+        tokenize='unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai
+    AFTER INSERT ON {TITLE_TABLE} BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ad
+    AFTER DELETE ON {TITLE_TABLE} BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_au
+    AFTER UPDATE OF name, description ON {TITLE_TABLE} BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+)
+REBUILD_SEARCH_INDEX = (
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"
+)
+
+
+def is_search_index_supported():
+    return connection.vendor == 'sqlite'
+
+
+def create_title_search_index(**kwargs):
+    """Создаёт FTS5-индекс произведений и заполняет его (post_migrate)."""
+    if not is_search_index_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM sqlite_master WHERE type = %s AND name = %s',
+            ('table', SEARCH_TABLE)
+        )
+        exists = cursor.fetchone() is not None
+        for statement in CREATE_SEARCH_INDEX:
+            cursor.execute(statement)
+        if not exists:
+            cursor.execute(REBUILD_SEARCH_INDEX)
+
+
+def build_match_query(text):
+    """Превращает ввод пользователя в FTS5-запрос по префиксам слов."""
+    terms = re.findall(r'\w+', text)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_titles(queryset, text):
+    """Фильтрует произведения по тексту, сортируя по релевантности."""
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    if not is_search_index_supported():
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text)
+        )
+    # FTS-таблица присоединяется к выборке один раз: MATCH выполняется
+    # один раз на запрос, а rank читается из той же строки индекса.
+    # Связь по rowid задаётся через filter(), чтобы псевдоним таблицы
+    # произведений подставлялся и во вложенных запросах.
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[f'{SEARCH_TABLE} MATCH %s'],
+        params=[match],
+    ).filter(
+        pk=RawSQL(f'{SEARCH_TABLE}.rowid', ())
+    ).annotate(
+        search_rank=RawSQL(
+            f'+{SEARCH_TABLE}.rank', (), output_field=FloatField()
+        )
+    ).order_by('search_rank', *Title._meta.ordering)
@@ -0,0 +1,160 @@
+from django.db import transaction
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+    pre_save
+)
+from django.dispatch import Signal, receiver
+
+from reviews.models import Comment, Review, Title, TitleRanking
+from reviews.rankings import (
+    ensure_title_ranking,
+    shift_catalog_totals,
+    update_bayesian_rating,
+    update_trending_score
+)
+from reviews.stats import update_score_count
+
+# Отправляется после обновления агрегатов оценок произведения.
+title_rating_changed = Signal()
+
+
+def update_title_rating(title_id, score_delta, count_delta):
+    """Атомарно сдвигает сумму оценок и число отзывов произведения
+    и каталога."""
+    score_sum = F('score_sum') + score_delta
+    review_count = F('review_count') + count_delta
+    Title.all_objects.filter(pk=title_id).update(
+        score_sum=score_sum,
+        review_count=review_count,
+        average_score=Coalesce(
+            Cast(score_sum, FloatField()) / NullIf(review_count, 0), 0.0
+        ),
+    )
+    shift_catalog_totals(score_delta, count_delta)
+    update_bayesian_rating(title_id)
+    title_rating_changed.send(sender=Title, title_id=title_id)
+
+
+@receiver(post_init, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    """Запоминает исходные оценку и произведение отзыва."""
+    instance._original_score = instance.score
+    instance._original_title_id = instance.title_id
+
+
+@receiver(pre_save, sender=Review)
+@receiver(pre_delete, sender=Review)
+def lock_review_score(sender, instance, raw=False, **kwargs):
+    """Перечитывает сохранённые оценку и произведение отзыва.
+
+    Загруженная вместе с объектом оценка могла устареть из-за
+    параллельной правки, и разница сдвинула бы агрегаты дважды. Внутри
+    транзакции строка сначала блокируется пустым обновлением: в SQLite
+    транзакция, начатая с чтения, не дожидается блокировки на запись.
+    """
+    if raw or instance._state.adding:
+        return
+    reviews = Review.objects.using(instance._state.db).filter(pk=instance.pk)
+    if transaction.get_connection(instance._state.db).in_atomic_block:
+        reviews.update(score=F('score'))
+    stored = reviews.values_list('score', 'title_id').first()
+    if stored is not None:
+        instance._original_score, instance._original_title_id = stored
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    """Пересчитывает агрегаты произведения после сохранения отзыва."""
+    if raw:
+        return
+    score = int(instance.score)
+    if created:
+        ensure_title_ranking(instance.title_id)
+        update_title_rating(instance.title_id, score, 1)
+        update_trending_score(instance.title_id, instance.pub_date, 1)
+        update_score_count(instance.title_id, score, 1)
+    elif instance._original_title_id != instance.title_id:
+        ensure_title_ranking(instance.title_id)
+        update_title_rating(
+            instance._original_title_id, -int(instance._original_score), -1
+        )
+        update_title_rating(instance.title_id, score, 1)
+        update_trending_score(
+            instance._original_title_id, instance.pub_date, -1
+        )
+        update_trending_score(instance.title_id, instance.pub_date, 1)
+        update_score_count(
+            instance._original_title_id, int(instance._original_score), -1
+        )
+        update_score_count(instance.title_id, score, 1)
+    elif int(instance._original_score) != score:
+        update_title_rating(
+            instance.title_id, score - int(instance._original_score), 0
+        )
+        update_score_count(
+            instance.title_id, int(instance._original_score), -1
+        )
+        update_score_count(instance.title_id, score, 1)
+    remember_review_score(sender, instance)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Вычитает оценку удалённого отзыва из агрегатов произведения."""
+    update_title_rating(
+        instance._original_title_id, -int(instance._original_score), -1
+    )
+    update_trending_score(
+        instance._original_title_id, instance.pub_date, -1
+    )
+    update_score_count(
+        instance._original_title_id, int(instance._original_score), -1
+    )
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, raw=False, **kwargs):
+    """Создаёт строку рейтингов нового произведения и убирает удалённое
+    из топа и трендов."""
+    if raw:
+        return
+    if created:
+        ensure_title_ranking(instance.pk)
+    elif instance.is_deleted:
+        TitleRanking.objects.filter(title_id=instance.pk).delete()
+
+
+def update_comment_count(review_id, delta):
+    Review.objects.filter(pk=review_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+@receiver(post_init, sender=Comment)
+def remember_comment_review(sender, instance, **kwargs):
+    """Запоминает исходный отзыв комментария."""
+    instance._original_review_id = instance.review_id
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    """Пересчитывает число комментариев отзыва."""
+    if raw:
+        return
+    if created:
+        update_comment_count(instance.review_id, 1)
+    elif instance._original_review_id != instance.review_id:
+        update_comment_count(instance._original_review_id, -1)
+        update_comment_count(instance.review_id, 1)
+    remember_comment_review(sender, instance)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    # При каскадном удалении отзыва обновление ничего не затронет.
+    update_comment_count(instance._original_review_id, -1)
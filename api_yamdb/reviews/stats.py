@@ -0,0 +1,95 @@
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from reviews.models import Review, Title, TitleScoreCount
+
+# Допустимые оценки отзывов.
+SCORES = range(1, 11)
+REBUILD_BATCH_SIZE = 500
+
+
+def update_score_count(title_id, score, delta):
+    """Сдвигает число отзывов произведения с оценкой score на delta.
+
+    Строка счётчика создаётся только при добавлении отзыва: при удалении
+    произведения каскадом её уже может не быть.
+    """
+    if delta > 0:
+        TitleScoreCount.objects.bulk_create(
+            [TitleScoreCount(title_id=title_id, score=score)],
+            ignore_conflicts=True
+        )
+    TitleScoreCount.objects.filter(title_id=title_id, score=score).update(
+        count=F('count') + delta
+    )
+
+
+def get_title_stats(title_id):
+    """Число отзывов, средняя оценка и распределение оценок или None."""
+    counts = dict(
+        TitleScoreCount.objects.filter(
+            title_id=title_id, title__is_deleted=False
+        ).values_list('score', 'count')
+    )
+    if not counts and not Title.objects.filter(pk=title_id).exists():
+        return None
+    total = sum(counts.values())
+    score_sum = sum(score * count for score, count in counts.items())
+    return {
+        'count': total,
+        'mean': score_sum / total if total else None,
+        'histogram': [
+            {'score': score, 'count': counts.get(score, 0)}
+            for score in SCORES
+        ],
+    }
+
+
+def rebuild_title_score_counts():
+    """Пересчитывает счётчики оценок всех произведений одной группировкой."""
+    with transaction.atomic():
+        counts = [
+            TitleScoreCount(title_id=title_id, score=score, count=count)
+            for title_id, score, count in Review.objects.order_by().values(
+                'title_id', 'score'
+            ).annotate(count=Count('pk')).values_list(
+                'title_id', 'score', 'count'
+            ).iterator()
+        ]
+        TitleScoreCount.objects.all().delete()
+        TitleScoreCount.objects.bulk_create(
+            counts, batch_size=REBUILD_BATCH_SIZE
+        )
+    return len(counts)
+
+
+def rebuild_title_ratings():
+    """Пересчитывает сумму оценок и число отзывов всех произведений
+    одной группировкой отзывов.
+
+    Записываются только расходящиеся произведения, их id возвращаются.
+    """
+    with transaction.atomic():
+        totals = {
+            title_id: (score_sum, review_count)
+            for title_id, score_sum, review_count in Review.objects.order_by()
+            .values('title_id').annotate(
+                score_sum=Sum('score'), review_count=Count('pk')
+            ).values_list('title_id', 'score_sum', 'review_count')
+            .iterator()
+        }
+        titles = []
+        for title_id, *current in Title.all_objects.values_list(
+            'pk', 'score_sum', 'review_count'
+        ).iterator():
+            score_sum, review_count = totals.get(title_id, (0, 0))
+            if tuple(current) == (score_sum, review_count):
+                continue
+            titles.append(Title(
+                pk=title_id, score_sum=score_sum, review_count=review_count,
+                average_score=score_sum / review_count if review_count else 0
+            ))
+        Title.all_objects.bulk_update(
+            titles, Title.AGGREGATE_FIELDS, batch_size=REBUILD_BATCH_SIZE
+        )
+    return [title.pk for title in titles]
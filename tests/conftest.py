@@ -1,6 +1,8 @@
 import os
 import sys
 
+import pytest
+
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -32,4 +34,18 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 
 pytest_plugins = [
     'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_cache',
 ]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(
+    django_db_modify_db_settings_parallel_suffix, tmp_path_factory
+):
+    """Тестовая база в файле, а не в памяти: параллельные запросы в тестах
+    ждут блокировку SQLite, а не получают ошибку. Файл свой у каждого
+    запуска, поэтому одновременные запуски не делят одну базу."""
+    from django.conf import settings
+
+    path = tmp_path_factory.mktemp('db') / 'api_yamdb_test.sqlite3'
+    settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = str(path)
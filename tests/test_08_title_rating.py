@@ -0,0 +1,147 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def test_01_rating_follows_review_changes(self, client, admin_client,
+                                              admin, user_client, user,
+                                              moderator_client, moderator):
+        from reviews.models import Review, Title
+
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.review_count) == (15, 3), (
+            'Проверьте, что создание отзыва обновляет сумму оценок и '
+            'количество отзывов произведения.'
+        )
+
+        response = admin_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            ),
+            data={'score': 8}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.json().get('rating') == 6, (
+            'Проверьте, что изменение оценки в отзыве пересчитывает '
+            'рейтинг произведения.'
+        )
+        assert 'score_sum' not in response.json()
+        assert 'review_count' not in response.json()
+
+        Review.objects.filter(pk=reviews[1]['id']).delete()
+        moderator.delete()
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count) == (8, 1), (
+            'Проверьте, что удаление отзыва, в том числе каскадное, '
+            'обновляет агрегаты произведения.'
+        )
+        assert title.average_score == 8
+
+        admin_client.patch(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id),
+            data={'name': 'Новое название'}
+        )
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count) == (8, 1), (
+            'Проверьте, что изменение произведения не перезаписывает '
+            'агрегаты отзывов.'
+        )
+
+    def test_02_rebuild_title_ratings(self, client, admin_client, admin,
+                                      user_client, user):
+        from django.core.management import call_command
+
+        from reviews.models import Title, TitleRanking
+        from reviews.rankings import get_ranking_state
+
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        expected = set(Title.objects.values_list(
+            'pk', 'score_sum', 'review_count', 'average_score'
+        ))
+        rankings = set(TitleRanking.objects.values_list(
+            'title_id', 'bayesian_rating'
+        ))
+        rating = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        ).json()['rating']
+        # Как после загрузки CSV в обход сигналов.
+        Title.objects.update(score_sum=0, review_count=0, average_score=0)
+        call_command('rebuild_title_cards')
+        ratings = {
+            title['id']: title['rating']
+            for title in client.get('/api/v1/titles/').json()['results']
+        }
+        assert ratings[title_id] is None
+
+        call_command('rebuild_title_ratings')
+        assert set(Title.objects.values_list(
+            'pk', 'score_sum', 'review_count', 'average_score'
+        )) == expected, (
+            'Проверьте, что команда `rebuild_title_ratings` восстанавливает '
+            'агрегаты оценок по отзывам.'
+        )
+        assert set(TitleRanking.objects.values_list(
+            'title_id', 'bayesian_rating'
+        )) == rankings
+        state = get_ranking_state()
+        assert state.review_count == sum(
+            count for _, _, count, _ in expected
+        )
+        ratings = {
+            title['id']: title['rating']
+            for title in client.get('/api/v1/titles/').json()['results']
+        }
+        assert ratings[title_id] == rating, (
+            'Проверьте, что после пересчёта обновляются карточки и кэш.'
+        )
+
+    def test_03_stale_review_instances(self, admin, user):
+        from django.db import transaction
+
+        from reviews.models import Review, Title
+        from reviews.rankings import get_ranking_state
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(title=title, author=user, text='Да',
+                                       score=5)
+        Review.objects.create(title=title, author=admin, text='Нет', score=1)
+        first = Review.objects.get(pk=review.pk)
+        second = Review.objects.get(pk=review.pk)
+        first.score = 8
+        first.save()
+        second.score = 3
+        with transaction.atomic():
+            second.save()
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count) == (4, 2), (
+            'Проверьте, что разница оценок считается от сохранённой в базе '
+            'оценки, а не от загруженной вместе с отзывом.'
+        )
+
+        first.delete()
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count) == (1, 1)
+        state = get_ranking_state()
+        assert (state.score_sum, state.review_count) == (1, 1)
@@ -0,0 +1,85 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryBudget:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_titles_list_query_budget(self, client, admin_client,
+                                         django_assert_num_queries):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        template = Title.objects.get(pk=titles[0]['id'])
+        for idx in range(8):
+            extra = Title.objects.create(
+                name=f'Копия {idx}',
+                year=2000 + idx,
+                category=template.category,
+            )
+            extra.genre.set(template.genre.all())
+
+        # COUNT для пагинации, страница произведений, карточки страницы.
+        with django_assert_num_queries(3):
+            response = client.get(self.TITLES_URL)
+        assert len(response.json()['results']) == 10
+
+    def test_02_titles_detail_query_budget(self, client, admin_client,
+                                           django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        with django_assert_num_queries(2):
+            client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(
+                    title_id=titles[0]['id']
+                )
+            )
+
+    def test_03_titles_write_query_budget(self, admin_client,
+                                          django_assert_num_queries):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from api.serializers import TitleSerializer
+        from reviews.models import Genre, Title
+
+        titles, categories, genres = create_titles(admin_client)
+        for idx in range(5):
+            Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        slugs = list(Genre.objects.values_list('slug', flat=True))
+
+        # Произведение с категорией и жанры одним prefetch.
+        title = Title.objects.get(pk=titles[0]['id'])
+        with django_assert_num_queries(2):
+            TitleSerializer().to_representation(title)
+
+        counts = []
+        for size in (1, len(slugs)):
+            data = {
+                'name': f'Новое {size}', 'year': 2000,
+                'category': categories[0]['slug'], 'genre': slugs[:size],
+            }
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(
+                    self.TITLES_URL, data, format='json'
+                )
+            assert response.status_code == 201
+            assert len(response.json()['genre']) == size
+            post_queries = len(context.captured_queries)
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.patch(
+                    self.TITLES_DETAIL_URL_TEMPLATE.format(
+                        title_id=response.json()['id']
+                    ),
+                    {'genre': slugs[:size], 'name': f'Изменённое {size}'},
+                    format='json'
+                )
+            assert response.status_code == 200
+            counts.append((post_queries, len(context.captured_queries)))
+        assert counts[0] == counts[1], (
+            'Проверьте, что число запросов при создании и изменении '
+            f'произведения не зависит от числа жанров: {counts}.'
+        )
@@ -0,0 +1,183 @@
+import json
+from base64 import b64encode
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def collect_pages(self, client, url):
+        results = []
+        pages = 0
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Курсорная пагинация не должна считать общее количество '
+                'объектов.'
+            )
+            results.extend(data['results'])
+            url = data['next']
+            pages += 1
+        return results, pages
+
+    def test_01_titles_cursor_matches_ordering(self, client):
+        from reviews.models import Title
+
+        for idx in range(23):
+            Title.objects.create(name=f'Произведение {idx % 4}',
+                                 year=1990 + idx % 3)
+        expected = list(
+            Title.objects.order_by('-year', 'name', 'id')
+            .values_list('id', flat=True)
+        )
+
+        results, pages = self.collect_pages(
+            client, f'{self.TITLES_URL}?cursor='
+        )
+        assert [title['id'] for title in results] == expected
+        assert pages == 3
+
+        response = client.get(self.TITLES_URL)
+        assert response.json()['count'] == 23, (
+            'Без параметра `cursor` должна работать постраничная пагинация.'
+        )
+
+    def test_02_invalid_cursor(self, client):
+        response = client.get(f'{self.TITLES_URL}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        for position in (
+            ['abc', 'x', 1], [{}, 'x', 1], [None, None, None], [1990, 'x'],
+        ):
+            cursor = b64encode(json.dumps(position).encode()).decode()
+            response = client.get(self.TITLES_URL, {'cursor': cursor})
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что курсор {position} отклоняется с ответом 404.'
+            )
+        for url, position in (
+            (self.TITLES_URL, '[1e400, "x", 1]'),
+            (self.TITLES_URL, f'[{10 ** 30}, "x", 1]'),
+            (self.TITLES_URL, f'[1990, "x", {-10 ** 30}]'),
+            (f'{self.TITLES_URL}top/', '[NaN, 1]'),
+            (f'{self.TITLES_URL}top/', f'[1.5, {10 ** 30}]'),
+            (f'{self.TITLES_URL}trending/', '[-Infinity, 1]'),
+        ):
+            cursor = b64encode(position.encode()).decode()
+            response = client.get(url, {'cursor': cursor})
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что курсор {position} вне диапазона полей '
+                'отклоняется с ответом 404.'
+            )
+
+    def test_03_reviews_and_comments_cursor(self, client, admin):
+        from reviews.models import Comment, Review, Title, User
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        for idx in range(12):
+            author = User.objects.create(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text=f'Отзыв {idx}', score=5
+            )
+        review = Review.objects.first()
+        for idx in range(12):
+            Comment.objects.create(
+                review=review, author=admin, text=f'Комментарий {idx}'
+            )
+
+        for url, queryset in (
+            (f'{self.TITLES_URL}{title.id}/reviews/?cursor=',
+             title.reviews.all()),
+            (f'{self.TITLES_URL}{title.id}/reviews/{review.id}/comments/'
+             '?cursor=', review.comments.all()),
+        ):
+            results, pages = self.collect_pages(client, url)
+            expected = list(
+                queryset.order_by('-pub_date', '-id')
+                .values_list('id', flat=True)
+            )
+            assert [obj['id'] for obj in results] == expected
+            assert pages == 2
+
+    def test_04_titles_cursor_plan(self):
+        from api.pagination import KeysetPagination
+        from reviews.models import Title
+
+        ordering = ('-year', 'name', 'id')
+        plan = Title.objects.order_by(*ordering).filter(
+            KeysetPagination.get_keyset_filter(ordering, [1990, 'Т', 5])
+        )[:10].explain()
+        assert 'title_year_name_id_idx (year<?)' in plan, (
+            'Проверьте, что страница по курсору начинает просмотр индекса '
+            f'с позиции курсора. План запроса: {plan}'
+        )
+        assert 'TEMP B-TREE' not in plan and 'MULTI-INDEX' not in plan, (
+            'Проверьте, что страница по курсору не сортирует строки за '
+            f'курсором. План запроса: {plan}'
+        )
+
+    def test_05_feeds_cursor_plan(self, client, admin):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Comment, Review, Title, User
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        for idx in range(12):
+            author = User.objects.create(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text=f'Отзыв {idx}', score=5
+            )
+        review = Review.objects.first()
+        for idx in range(12):
+            Comment.objects.create(
+                review=review, author=admin, text=f'Комментарий {idx}'
+            )
+
+        for url, table, index in (
+            (f'{self.TITLES_URL}{title.id}/reviews/?cursor=',
+             'reviews_review', 'review_title_pub_date_idx (title_id=? AND '
+             'pub_date<?)'),
+            (f'{self.TITLES_URL}{title.id}/reviews/{review.id}/comments/'
+             '?cursor=', 'reviews_comment', 'comment_review_pub_date_idx '
+             '(review_id=? AND pub_date<?)'),
+        ):
+            next_url = client.get(url).json()['next']
+            with CaptureQueriesContext(connection) as context:
+                assert client.get(next_url).status_code == HTTPStatus.OK
+            sql = next(
+                query['sql'] for query in context.captured_queries
+                if 'pub_date" <' in query['sql']
+                and query['sql'].startswith('SELECT')
+                and f'FROM "{table}"' in query['sql']
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+            assert index in plan, (
+                'Проверьте, что следующая страница ленты читает диапазон '
+                f'индекса от позиции курсора. План запроса: {plan}'
+            )
+            assert 'TEMP B-TREE' not in plan
+
+    def test_06_search_cursor(self, client):
+        from reviews.models import Title
+
+        for idx in range(15):
+            Title.objects.create(name=f'Terminator {idx}', year=2000 + idx % 3)
+        for params in ('', '&fields=id'):
+            results, pages = self.collect_pages(
+                client, f'{self.TITLES_URL}?search=termin&cursor={params}'
+            )
+            assert sorted(title['id'] for title in results) == sorted(
+                Title.objects.values_list('id', flat=True)
+            ), 'Проверьте, что курсор работает вместе с поиском.'
+            assert pages == 2
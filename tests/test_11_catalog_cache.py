@@ -0,0 +1,76 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CatalogCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+
+    def test_01_anonymous_list_is_cached(self, client, admin_client,
+                                         django_assert_num_queries):
+        create_titles(admin_client)
+        client.get(f'{self.TITLES_URL}?year=1984&name=Т')
+        with django_assert_num_queries(0):
+            response = client.get(f'{self.TITLES_URL}?name=Т&year=1984')
+        assert response.json()['count'] == 1
+
+    def test_02_cache_invalidated_on_changes(self, client, admin_client,
+                                             user_client):
+        titles, _, genres = create_titles(admin_client)
+        detail_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        assert client.get(detail_url).json()['rating'] is None
+
+        user_client.post(
+            f'{detail_url}reviews/', data={'text': 'Отзыв', 'score': 7}
+        )
+        assert client.get(detail_url).json()['rating'] == 7, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведения.'
+        )
+
+        admin_client.patch(detail_url, data={'genre': [genres[2]['slug']]})
+        genre_slugs = [
+            genre['slug'] for genre in client.get(detail_url).json()['genre']
+        ]
+        assert genre_slugs == [genres[2]['slug']], (
+            'Проверьте, что изменение жанров сбрасывает кэш произведения.'
+        )
+
+        assert client.get(self.GENRES_URL).json()['count'] == 3
+        admin_client.delete(f'{self.GENRES_URL}{genres[0]["slug"]}/')
+        assert client.get(self.GENRES_URL).json()['count'] == 2
+
+    def test_03_versions_bumped_after_commit(self, admin_client, user,
+                                             monkeypatch):
+        import api.signals
+        from django.db import transaction
+
+        from api.cache import bump_version, get_versions
+        from reviews.models import Review, Title, TitleCard
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        cards_at_bump = []
+
+        def record_bump(model):
+            cards_at_bump.append(
+                TitleCard.objects.get(title_id=title_id).data
+            )
+            bump_version(model)
+
+        monkeypatch.setattr(api.signals, 'bump_version', record_bump)
+        before = get_versions([Review])
+        with transaction.atomic():
+            Review.objects.create(
+                title_id=title_id, author=user, text='Отзыв', score=9
+            )
+            assert get_versions([Review]) == before, (
+                'Проверьте, что версии сдвигаются только после фиксации.'
+            )
+        assert get_versions([Review]) != before
+        assert cards_at_bump and all(
+            '"rating":9' in data for data in cards_at_bump
+        ), 'Проверьте, что версии сдвигаются после перестройки карточек.'
+        assert Title.objects.get(pk=title_id).review_count == 1
@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConditionalGet:
+
+    def test_01_etag_and_not_modified(self, client, admin_client, admin,
+                                      user_client, user,
+                                      django_assert_max_num_queries):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_id = titles[0]['id']
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title_id}/',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/'
+            'comments/',
+        )
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.has_header('ETag'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовок ETag.'
+            )
+            assert response.has_header('Last-Modified')
+            with django_assert_max_num_queries(1):
+                response = client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+            assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        etag = client.get(url)['ETag']
+        admin_client.patch(
+            f'{url}{reviews[0]["id"]}/', data={'text': 'Новый текст'}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение отзыва меняет ETag списка отзывов.'
+        )
+
+    def test_02_user_saves_and_last_modified(self, client, admin_client,
+                                             admin, user_client, user):
+        from reviews.models import User
+
+        author_map = {admin: admin_client, user: user_client}
+        _, _, titles = create_comments(admin_client, author_map)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url)
+        etag = response['ETag']
+
+        User.objects.filter(pk=user.pk).update(confirmation_code='code')
+        response = client.post('/api/v1/auth/token/', {
+            'username': user.username, 'confirmation_code': 'code'
+        })
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что вход пользователя не меняет ETag лент отзывов.'
+        )
+
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=response.get(
+            'Last-Modified', 'Thu, 01 Jan 2099 00:00:00 GMT'
+        ))
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ответ 304 отдаётся только по ETag.'
+        )
+
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', {'username': 'renamed'},
+            format='json'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена имени автора меняет ETag лент отзывов.'
+        )
+        assert 'renamed' in {
+            review['author'] for review in response.json()['results']
+        }
@@ -0,0 +1,71 @@
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleCards:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def check_cards_match_detail(self, client):
+        results = client.get(self.TITLES_URL).json()['results']
+        assert results
+        for title in results:
+            detail = client.get(f'{self.TITLES_URL}{title["id"]}/').json()
+            assert title == detail, (
+                'Проверьте, что карточка произведения в списке совпадает с '
+                'ответом на запрос отдельного произведения.'
+            )
+
+    def test_01_cards_follow_changes(self, client, admin_client, admin,
+                                     user_client, user):
+        from reviews.models import Category, Genre, TitleCard
+
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        assert TitleCard.objects.count() == len(titles)
+        self.check_cards_match_detail(client)
+
+        user_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+            f'{user.reviews.get().id}/',
+            data={'score': 9}
+        )
+        Category.objects.filter(slug='films').get().save()
+        genre = Genre.objects.get(slug='comedy')
+        genre.name = 'Комедия положений'
+        genre.save()
+        Category.objects.get(slug='books').delete()
+        self.check_cards_match_detail(client)
+
+        TitleCard.objects.all().delete()
+        call_command('rebuild_title_cards')
+        assert TitleCard.objects.count() == len(titles)
+        self.check_cards_match_detail(client)
+
+    def test_02_page_query_reads_only_keys(self, client, admin_client,
+                                           settings):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        settings.TITLE_FACET_INDEX_ENABLED = False
+        create_titles(admin_client)
+        for params in ({}, {'cursor': ''}, {'ordering': '-rating',
+                                             'cursor': ''},
+                       {'search': 'Terminator', 'cursor': ''}):
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(self.TITLES_URL, params)
+            assert response.status_code == 200
+            title_queries = [
+                query['sql'] for query in context.captured_queries
+                if 'FROM "reviews_title"' in query['sql']
+            ]
+            assert title_queries and not any(
+                '"reviews_title"."description"' in sql
+                for sql in title_queries
+            ), (
+                'Проверьте, что страница списка произведений читает только '
+                f'ключи сортировки, а не строки целиком ({params}).'
+            )
@@ -0,0 +1,78 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'search': query})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_name_and_description(self, client, admin_client):
+        from reviews.models import Title
+
+        titles, categories, _ = create_titles(admin_client)
+        assert self.search(client, 'термин') == ['Терминатор'], (
+            'Проверьте, что поиск поддерживает префиксы слов без учёта '
+            'регистра.'
+        )
+        assert self.search(client, 'yippie') == ['Крепкий орешек'], (
+            'Проверьте, что поиск выполняется и по описанию произведения.'
+        )
+        assert self.search(client, 'несуществующее') == []
+
+        Title.objects.filter(pk=titles[1]['id']).update(
+            description='Терминатор упоминается дважды: терминатор'
+        )
+        assert self.search(client, 'терминатор') == [
+            'Крепкий орешек', 'Терминатор'
+        ], 'Проверьте, что результаты поиска упорядочены по релевантности.'
+
+        response = client.get(
+            self.TITLES_URL,
+            {'search': 'терминатор', 'category': categories[1]['slug']}
+        )
+        assert [title['name'] for title in response.json()['results']] == [
+            'Крепкий орешек'
+        ], 'Проверьте, что поиск сочетается с остальными фильтрами.'
+
+        Title.objects.filter(pk=titles[0]['id']).delete()
+        assert self.search(client, 'терминатор') == ['Крепкий орешек']
+
+    def test_02_single_match(self, client, admin_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Title
+        from reviews.search import search_titles
+
+        create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            assert self.search(client, 'термин') == ['Терминатор']
+        page = next(
+            query['sql'] for query in context.captured_queries
+            if 'search_rank' in query['sql']
+        )
+        assert page.count('MATCH') == 1, (
+            'Проверьте, что FTS-индекс присоединяется один раз, а '
+            'релевантность не ищется заново для каждой строки.'
+        )
+        plan = search_titles(Title.objects.all(), 'термин').explain()
+        assert 'INTEGER PRIMARY KEY (rowid=?)' in plan, plan
+
+        response = client.get(
+            f'{self.TITLES_URL}facets/', {'search': 'термин'}
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что поиск работает во вложенных запросах фасетов.'
+        )
+        assert sum(
+            item['count'] for item in response.json()['years']
+        ) == 1
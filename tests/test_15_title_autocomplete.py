@@ -0,0 +1,61 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleAutocomplete:
+
+    AUTOCOMPLETE_URL = '/api/v1/titles/autocomplete/'
+
+    def suggest(self, client, query, **params):
+        response = client.get(self.AUTOCOMPLETE_URL, {'q': query, **params})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Эндпоинт `{self.AUTOCOMPLETE_URL}` не найден или возвращает '
+            'ошибку.'
+        )
+        return [title['name'] for title in response.json()]
+
+    def test_01_autocomplete(self, client, admin_client,
+                             django_assert_num_queries):
+        from reviews.models import Title
+
+        create_titles(admin_client)
+        assert self.suggest(client, 'КРЕП') == ['Крепкий орешек']
+        with django_assert_num_queries(0):
+            assert self.suggest(client, 'ореш') == ['Крепкий орешек'], (
+                'Проверьте, что подсказки ищут по началу любого слова '
+                'названия и не обращаются к базе данных.'
+            )
+
+        title = Title.objects.create(name='Ёжик в тумане', year=1975)
+        assert self.suggest(client, 'еж') == ['Ёжик в тумане']
+        title.name = 'Ёжик в сумерках'
+        title.save()
+        assert self.suggest(client, 'ежик в с') == ['Ёжик в сумерках']
+        assert self.suggest(client, 'ежик в т') == []
+        title.delete()
+        assert self.suggest(client, 'еж') == []
+
+        for idx in range(5):
+            Title.objects.create(name=f'Кино {idx}', year=2000)
+        assert len(self.suggest(client, 'кино', limit=3)) == 3
+
+    def test_02_autocomplete_reloads_on_version_change(self, client,
+                                                       admin_client):
+        from api.cache import bump_version
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        assert self.suggest(client, 'крепкий') == ['Крепкий орешек']
+
+        # Переименование в другом процессе: меняется только версия Title.
+        Title.objects.filter(pk=titles[1]['id']).update(name='Кремень')
+        bump_version(Title)
+        assert self.suggest(client, 'крепкий') == [], (
+            'Проверьте, что индекс подсказок перезагружается, когда версия '
+            'произведений изменилась в другом процессе.'
+        )
+        assert self.suggest(client, 'кремень') == ['Кремень']
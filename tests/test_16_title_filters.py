@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def filter_names(self, client, **params):
+        response = client.get(self.TITLES_URL, params)
+        return sorted(title['name'] for title in response.json()['results'])
+
+    def test_01_exact_and_range_filters(self, client, admin_client):
+        from reviews.models import Genre, Title
+
+        titles, _, genres = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[1]['id'])
+        title.genre.add(Genre.objects.get(slug=genres[0]['slug']))
+
+        assert self.filter_names(client, year=198) == []
+        assert self.filter_names(client, year_min=1985) == ['Крепкий орешек']
+        assert self.filter_names(client, year_max=1985) == ['Терминатор']
+        assert self.filter_names(client, category='film') == [], (
+            'Проверьте, что фильтр по категории сравнивает slug целиком.'
+        )
+        assert self.filter_names(
+            client, genre=f'{genres[0]["slug"]},{genres[2]["slug"]}'
+        ) == ['Крепкий орешек', 'Терминатор']
+        assert self.filter_names(
+            client, genre=f'{genres[0]["slug"]},{genres[2]["slug"]}',
+            genre_match='all'
+        ) == ['Крепкий орешек']
+        response = client.get(self.TITLES_URL, {'genre': genres[0]['slug']})
+        assert response.json()['count'] == 2, (
+            'Проверьте, что фильтр по жанрам не дублирует произведения.'
+        )
+
+    def test_02_filters_use_indexes(self):
+        from api.filters import TitlesFilter
+        from reviews.models import Title
+
+        for params, expected in (
+            ({'year': 1984}, ('SEARCH reviews_title USING INDEX',)),
+            ({'year_min': 1980, 'year_max': 1990},
+             ('SEARCH reviews_title USING INDEX',)),
+            ({'category': 'films'},
+             ('USING COVERING INDEX', '(slug=?)',
+              'SEARCH reviews_title USING INDEX')),
+            ({'genre': 'horror,drama'},
+             ('USING COVERING INDEX', '(slug=?)',
+              'COVERING INDEX sqlite_autoindex_reviews_genretitle_1')),
+        ):
+            plan = TitlesFilter(params, Title.objects.all()).qs.explain()
+            for fragment in expected:
+                assert fragment in plan, (
+                    f'Проверьте, что фильтр {params} использует индексы. '
+                    f'План запроса: {plan}'
+                )
+
+    def test_03_invalid_year_filters(self, client, settings):
+        settings.TITLE_FACET_INDEX_ENABLED = True
+        for url in (self.TITLES_URL, f'{self.TITLES_URL}facets/',
+                    f'{self.TITLES_URL}export/'):
+            for params in ({'year': 'NaN'}, {'year_min': '1' + '0' * 30},
+                           {'year_max': '1990.5'}, {'year': '-1'}):
+                response = client.get(url, params)
+                assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                    f'Проверьте, что `{url}` с фильтром {params} '
+                    'возвращает ошибку 400.'
+                )
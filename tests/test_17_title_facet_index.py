@@ -0,0 +1,87 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleFacetIndex:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_facet_index_matches_sql(self, admin_client, settings,
+                                        django_assert_num_queries):
+        from reviews.models import Category, Genre, GenreTitle, Title
+
+        titles, categories, genres = create_titles(admin_client)
+        for idx in range(12):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=1980 + idx % 5,
+                category=Category.objects.get(slug='books')
+            )
+            GenreTitle.objects.create(
+                title=title, genre=Genre.objects.get(slug='drama')
+            )
+        queries = (
+            {},
+            {'page': 2},
+            {'category': categories[0]['slug']},
+            {'genre': 'horror,drama'},
+            {'genre': 'horror,comedy', 'genre_match': 'all'},
+            {'year': 1984},
+            {'year_min': 1981, 'year_max': 1983, 'category': 'books'},
+            {'category': 'unknown'},
+        )
+
+        def fetch_all():
+            return [admin_client.get(self.TITLES_URL, params).json()
+                    for params in queries]
+
+        settings.TITLE_FACET_INDEX_ENABLED = False
+        expected = fetch_all()
+        settings.TITLE_FACET_INDEX_ENABLED = True
+        assert fetch_all() == expected, (
+            'Проверьте, что фасетный индекс возвращает те же результаты, '
+            'что и фильтрация в базе данных.'
+        )
+        # Пользователь из токена и карточки страницы.
+        with django_assert_num_queries(2):
+            admin_client.get(self.TITLES_URL, {'genre': 'drama'})
+
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/',
+            data={'genre': [genres[2]['slug']], 'year': 1981}
+        )
+        Title.objects.filter(name='Произведение 3').get().delete()
+        Genre.objects.get(slug='comedy').delete()
+        Category.objects.get(slug='films').delete()
+        Title.objects.create(name='Новое', year=1983)
+
+        settings.TITLE_FACET_INDEX_ENABLED = False
+        expected = fetch_all()
+        settings.TITLE_FACET_INDEX_ENABLED = True
+        assert fetch_all() == expected, (
+            'Проверьте, что фасетный индекс обновляется при изменении '
+            'произведений и связей с жанрами.'
+        )
+
+    def test_02_facet_index_reloads_on_version_change(self, admin_client,
+                                                       settings):
+        from api.cache import bump_version
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        settings.TITLE_FACET_INDEX_ENABLED = True
+        params = {'year': 1970}
+        assert admin_client.get(self.TITLES_URL, params).json()['count'] == 0
+
+        # Изменение из другого процесса: сигналы этого процесса не
+        # срабатывают, меняется только версия модели.
+        Title.objects.filter(pk=titles[0]['id']).update(year=1970)
+        bump_version(Title)
+        response = admin_client.get(self.TITLES_URL, params).json()
+        assert [title['id'] for title in response['results']] == [
+            titles[0]['id']
+        ], (
+            'Проверьте, что фасетный индекс перезагружается, когда версии '
+            'моделей изменились в другом процессе.'
+        )
@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18TitleFacets:
+
+    FACETS_URL = '/api/v1/titles/facets/'
+
+    def test_01_facet_counts(self, client, admin_client,
+                             django_assert_num_queries):
+        from reviews.models import Title
+
+        create_titles(admin_client)
+        Title.objects.create(name='Без категории', year=1991)
+
+        with django_assert_num_queries(1):
+            response = client.get(self.FACETS_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Эндпоинт `{self.FACETS_URL}` не найден или возвращает ошибку.'
+        )
+        assert response.json() == {
+            'categories': [
+                {'slug': 'books', 'count': 1},
+                {'slug': 'films', 'count': 1},
+            ],
+            'genres': [
+                {'slug': 'comedy', 'count': 1},
+                {'slug': 'drama', 'count': 1},
+                {'slug': 'horror', 'count': 1},
+            ],
+            'years': [
+                {'year_min': 1980, 'year_max': 1989, 'count': 2},
+                {'year_min': 1990, 'year_max': 1999, 'count': 1},
+            ],
+        }
+
+        response = client.get(self.FACETS_URL, {'genre': 'horror,drama'})
+        data = response.json()
+        assert data['categories'] == [
+            {'slug': 'books', 'count': 1},
+            {'slug': 'films', 'count': 1},
+        ]
+        assert data['years'] == [
+            {'year_min': 1980, 'year_max': 1989, 'count': 2},
+        ], 'Проверьте, что счётчики учитывают применённые фильтры.'
+
+        with django_assert_num_queries(0):
+            client.get(self.FACETS_URL)
+        Title.objects.create(name='Ещё одно', year=2001)
+        years = client.get(self.FACETS_URL).json()['years']
+        assert years[-1] == {'year_min': 2000, 'year_max': 2009, 'count': 1}
@@ -0,0 +1,159 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19TitleRankings:
+
+    TOP_URL = '/api/v1/titles/top/'
+    TRENDING_URL = '/api/v1/titles/trending/'
+
+    def names(self, client, url):
+        return [title['name'] for title in client.get(url).json()['results']]
+
+    def test_01_top_and_trending(self, client, admin):
+        from reviews.models import Review, Title, TitleRanking, User
+
+        popular = Title.objects.create(name='Популярное', year=2000)
+        single = Title.objects.create(name='Один отзыв', year=2000)
+        fresh = Title.objects.create(name='Свежее', year=2000)
+        Title.objects.create(name='Без отзывов', year=2000)
+        authors = [
+            User.objects.create(username=f'u{idx}', email=f'u{idx}@ya.fake')
+            for idx in range(6)
+        ]
+        for author in authors:
+            Review.objects.create(
+                title=popular, author=author, text='Шедевр', score=10
+            )
+        Review.objects.create(title=single, author=admin, text='Хорошо',
+                              score=9)
+        Review.objects.create(title=fresh, author=authors[0], text='Так себе',
+                              score=4)
+
+        expected_top = ['Популярное', 'Один отзыв', 'Свежее']
+        assert self.names(client, self.TOP_URL) == expected_top
+        call_command('reconcile_title_rankings')
+        assert self.names(client, self.TOP_URL) == expected_top, (
+            'Проверьте, что байесовский рейтинг снижает вес произведений с '
+            'малым числом отзывов.'
+        )
+
+        old = timezone.now() - timedelta(days=60)
+        Review.objects.filter(title=popular).update(pub_date=old)
+        call_command('reconcile_title_rankings')
+        assert self.names(client, self.TRENDING_URL)[0] in (
+            'Один отзыв', 'Свежее'
+        ), 'Проверьте, что старые отзывы меньше влияют на популярность.'
+
+        Review.objects.filter(title=fresh).delete()
+        assert 'Свежее' not in self.names(client, self.TOP_URL)
+        assert 'Свежее' not in self.names(client, self.TRENDING_URL)
+        assert TitleRanking.objects.count() == 4
+
+    def test_02_incremental_catalog_totals(self, admin_client, admin, user):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import RankingState, Review, Title
+        from reviews.rankings import get_catalog_totals, get_ranking_state
+
+        first = Title.objects.create(name='Первое', year=2000)
+        second = Title.objects.create(name='Второе', year=2000)
+        Review.objects.create(title=first, author=user, text='Да', score=8)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                f'/api/v1/titles/{second.pk}/reviews/',
+                {'text': 'Нет', 'score': 3}, format='json'
+            )
+        assert response.status_code == 201
+        assert not any(
+            'SUM(' in query['sql'] for query in context.captured_queries
+        ), 'Проверьте, что средняя по каталогу не пересчитывается SUM.'
+        state = get_ranking_state()
+        assert (state.score_sum, state.review_count) == (11, 2)
+        Review.objects.filter(author=user).first().delete()
+        RankingState.objects.all().delete()
+        assert get_ranking_state().review_count == 1, (
+            'Проверьте, что суммы каталога создаются заново по агрегатам.'
+        )
+        assert get_catalog_totals() == (3, 1)
+
+    def test_03_trending_epoch_moves(self, client, admin, user):
+        from reviews.models import RankingState, Review, Title, TitleRanking
+        from reviews.rankings import get_ranking_state
+
+        old = Title.objects.create(name='Старое', year=2000)
+        fresh = Title.objects.create(name='Свежее', year=2000)
+        Review.objects.create(title=old, author=user, text='Да', score=8)
+        epoch = timezone.now() - timedelta(days=7 * 1100)
+        RankingState.objects.update(trending_epoch=epoch)
+        TitleRanking.objects.filter(title=old).update(trending_score=1e300)
+        Review.objects.create(title=fresh, author=admin, text='Да', score=8)
+        assert get_ranking_state().trending_epoch > epoch, (
+            'Проверьте, что эпоха весов популярности переносится вперёд.'
+        )
+        scores = dict(
+            TitleRanking.objects.values_list('title_id', 'trending_score')
+        )
+        assert scores[old.pk] < 1e300 / 2 ** 1000
+        assert 0.5 < scores[fresh.pk] < 2
+        Review.objects.filter(title=fresh).delete()
+        assert TitleRanking.objects.get(
+            title=fresh
+        ).trending_score == pytest.approx(0)
+
+    def test_04_keyset_pages_and_trending_leftovers(self, client, user,
+                                                    monkeypatch):
+        from django.db import connection
+        from django.db.models import F
+        from django.test.utils import CaptureQueriesContext
+
+        from api.pagination import TopRatedPagination, TrendingPagination
+        from reviews.models import Review, Title, TitleRanking
+
+        monkeypatch.setattr(TopRatedPagination, 'page_size', 2)
+        monkeypatch.setattr(TrendingPagination, 'page_size', 2)
+        for idx in range(5):
+            title = Title.objects.create(name=f'Произведение {idx}',
+                                         year=2000)
+            Review.objects.create(title=title, author=user, text='Да',
+                                  score=idx % 2 + 5)
+        for url, field in ((self.TOP_URL, 'bayesian_rating'),
+                           (self.TRENDING_URL, 'trending_score')):
+            expected = list(TitleRanking.objects.order_by(
+                f'-{field}', 'title'
+            ).values_list('title_id', flat=True))
+            ids = []
+            next_url = url
+            while next_url:
+                with CaptureQueriesContext(connection) as context:
+                    response = client.get(next_url).json()
+                assert not any(
+                    'COUNT(' in query['sql']
+                    for query in context.captured_queries
+                ), f'Проверьте, что `{url}` не считает все рейтинги COUNT.'
+                assert set(response) == {'next', 'results'}
+                ids += [title['id'] for title in response['results']]
+                next_url = response['next']
+            assert ids == expected, (
+                f'Проверьте, что курсоры `{url}` обходят все произведения '
+                'по порядку без пропусков и повторов.'
+            )
+
+        title = Title.objects.get(name='Произведение 0')
+        TitleRanking.objects.filter(title=title).update(
+            trending_score=F('trending_score') + 1e-12
+        )
+        Review.objects.filter(title=title).delete()
+        assert TitleRanking.objects.get(title=title).trending_score == 0, (
+            'Проверьте, что популярность произведения без отзывов '
+            'обнуляется, а не остаётся погрешностью вычитания.'
+        )
+        assert title.pk not in [
+            item['id']
+            for item in client.get(self.TRENDING_URL).json()['results']
+        ]
@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20TitleOrdering:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_ordering(self, client, admin):
+        from reviews.models import Review, Title, User
+
+        titles = [
+            Title.objects.create(name=name, year=year)
+            for name, year in (('Б', 2001), ('А', 1999), ('В', 2000))
+        ]
+        scores = ((titles[0], (4, 6)), (titles[2], (9,)))
+        idx = 0
+        for title, title_scores in scores:
+            for score in title_scores:
+                author = User.objects.create(
+                    username=f'u{idx}', email=f'u{idx}@yamdb.fake'
+                )
+                Review.objects.create(
+                    title=title, author=author, text='Отзыв', score=score
+                )
+                idx += 1
+
+        for ordering, expected in (
+            ('name', ['А', 'Б', 'В']),
+            ('-year', ['Б', 'В', 'А']),
+            ('-rating', ['В', 'Б', 'А']),
+            ('rating', ['А', 'Б', 'В']),
+            ('-review_count', ['Б', 'В', 'А']),
+        ):
+            response = client.get(self.TITLES_URL, {'ordering': ordering})
+            names = [title['name'] for title in response.json()['results']]
+            assert names == expected, (
+                f'Проверьте сортировку произведений по `{ordering}`.'
+            )
+
+        response = client.get(
+            self.TITLES_URL, {'ordering': '-rating', 'cursor': ''}
+        )
+        assert [title['name'] for title in response.json()['results']] == [
+            'В', 'Б', 'А'
+        ]
+
+        response = client.get(self.TITLES_URL, {'ordering': 'description'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что сортировка без индекса отклоняется.'
+        )
+
+    def test_02_ordering_uses_indexes(self):
+        from api.filters import TitleOrderingFilter
+        from reviews.models import Title
+
+        backend = TitleOrderingFilter()
+        for value in TitleOrderingFilter.orderings:
+            for ordering in (value, f'-{value}'):
+                plan = Title.objects.order_by(
+                    *backend.get_ordering(ordering)
+                )[:10].explain()
+                assert 'TEMP B-TREE' not in plan, (
+                    f'Проверьте, что сортировка `{ordering}` использует '
+                    f'индекс. План запроса: {plan}'
+                )
@@ -0,0 +1,48 @@
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21SparseFields:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_sparse_fields(self, client, admin_client, admin,
+                              user_client, user,
+                              django_assert_num_queries):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        title_id = titles[0]['id']
+
+        # COUNT и страница произведений без категорий и жанров.
+        with django_assert_num_queries(2):
+            response = client.get(
+                self.TITLES_URL, {'fields': 'id,name,rating'}
+            )
+        for title in response.json()['results']:
+            assert set(title) == {'id', 'name', 'rating'}, (
+                'Проверьте, что параметр `fields` ограничивает поля ответа.'
+            )
+
+        response = client.get(
+            f'{self.TITLES_URL}{title_id}/',
+            {'fields': 'id,name', 'expand': 'genre'}
+        )
+        data = response.json()
+        assert set(data) == {'id', 'name', 'genre'}
+        assert {genre['slug'] for genre in data['genre']} == set(
+            titles[0]['genre']
+        )
+
+        reviews_url = f'{self.TITLES_URL}{title_id}/reviews/'
+        # Last-Modified, произведение, COUNT и страница без авторов.
+        with django_assert_num_queries(4):
+            response = client.get(reviews_url, {'fields': 'id,score'})
+        for review in response.json()['results']:
+            assert set(review) == {'id', 'score'}
+
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        response = client.get(comments_url, {'fields': 'text,author'})
+        assert {comment['author'] for comment in response.json()['results']} \
+            == {admin.username, user.username}
@@ -0,0 +1,69 @@
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ValuesReaders:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_both(self, client, monkeypatch, viewset, url, params):
+        fast = client.get(url, params)
+        with monkeypatch.context() as patch:
+            patch.setattr(viewset, 'values_reader_class', None)
+            slow = client.get(url, params)
+        return fast, slow
+
+    def test_01_same_bytes_as_serializers(self, admin_client, admin,
+                                          user_client, user, monkeypatch):
+        from api.views import CommentViewSet, ReviewViewSet, TitleViewSet
+        from reviews.models import Title
+
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        Title.objects.create(name='Без категории', year=2000)
+        title_id = titles[0]['id']
+        reviews_url = f'{self.TITLES_URL}{title_id}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+
+        cases = (
+            (TitleViewSet, self.TITLES_URL, {'fields': 'id,name'}),
+            (TitleViewSet, self.TITLES_URL, {
+                'fields': 'id,name,year,description,rating',
+                'expand': 'category,genre',
+            }),
+            (TitleViewSet, self.TITLES_URL, {
+                'fields': 'id,rating,genre', 'ordering': '-rating',
+                'cursor': '',
+            }),
+            (ReviewViewSet, reviews_url, {}),
+            (ReviewViewSet, reviews_url, {'cursor': ''}),
+            (ReviewViewSet, reviews_url, {'fields': 'author,score'}),
+            (CommentViewSet, comments_url, {}),
+            (CommentViewSet, comments_url, {'fields': 'pub_date'}),
+        )
+        for viewset, url, params in cases:
+            fast, slow = self.get_both(
+                admin_client, monkeypatch, viewset, url, params
+            )
+            assert fast.status_code == slow.status_code == 200
+            assert fast.content == slow.content, (
+                f'Проверьте, что чтение через `.values()` для `{url}` '
+                f'с параметрами {params} совпадает с ответом сериализатора.'
+            )
+
+    def test_02_queries(self, client, admin_client, admin, user_client,
+                        user, django_assert_num_queries):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        title_id = titles[0]['id']
+
+        # COUNT, страница с категориями и один запрос жанров страницы.
+        with django_assert_num_queries(3):
+            client.get(
+                self.TITLES_URL, {'fields': 'id', 'expand': 'category,genre'}
+            )
+        # Last-Modified, произведение, COUNT и страница с авторами.
+        with django_assert_num_queries(4):
+            client.get(f'{self.TITLES_URL}{title_id}/reviews/')
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23TitleExport:
+
+    EXPORT_URL = '/api/v1/titles/export/'
+
+    def test_01_export(self, client, admin_client, admin, user_client,
+                       user, monkeypatch, tmp_path):
+        from rest_framework.renderers import JSONRenderer
+
+        from api import export
+        from api.serializers import ReviewSerializer, TitleGETSerializer
+        from reviews.models import Title
+
+        author_map = {admin: admin_client, user: user_client}
+        create_comments(admin_client, author_map)
+        monkeypatch.setattr(export, 'EXPORT_BATCH_SIZE', 1)
+
+        response = client.get(self.EXPORT_URL)
+        assert response.status_code == 200
+        assert response.streaming, (
+            'Проверьте, что выгрузка каталога отдаётся потоком.'
+        )
+        assert response['Content-Type'] == 'application/x-ndjson'
+        titles = Title.objects.order_by('pk')
+        expected = b''.join(
+            JSONRenderer().render(TitleGETSerializer(title).data) + b'\n'
+            for title in titles
+        )
+        content = b''.join(response.streaming_content)
+        assert content == expected, (
+            'Проверьте, что строки выгрузки совпадают с представлением '
+            'TitleGETSerializer.'
+        )
+
+        response = client.get(self.EXPORT_URL, {'reviews': 'true'})
+        lines = b''.join(response.streaming_content).splitlines()
+        assert len(lines) == titles.count()
+        for title, line in zip(titles, lines):
+            item = json.loads(line)
+            reviews = ReviewSerializer(
+                title.reviews.order_by('-pub_date', '-id'), many=True
+            ).data
+            assert item['reviews'] == json.loads(
+                JSONRenderer().render(reviews)
+            ), 'Проверьте, что выгрузка с `reviews` содержит отзывы.'
+
+        category = titles[0].category.slug
+        response = client.get(self.EXPORT_URL, {'category': category})
+        lines = b''.join(response.streaming_content).splitlines()
+        assert len(lines) == titles.filter(category__slug=category).count()
+
+        path = tmp_path / 'titles.ndjson'
+        call_command('export_titles', str(path))
+        assert path.read_bytes() == expected, (
+            'Проверьте, что команда `export_titles` пишет ту же выгрузку.'
+        )
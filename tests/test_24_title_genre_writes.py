@@ -0,0 +1,76 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24TitleGenreWrites:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def post_title(self, admin_client, genres):
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.TITLES_URL, data={
+                'name': 'Произведение', 'year': 2000, 'category': 'films',
+                'genre': genres,
+            }, format='json')
+        assert response.status_code == 201
+        return response, context.captured_queries
+
+    @staticmethod
+    def count(queries, *fragments):
+        return sum(
+            all(fragment in query['sql'] for fragment in fragments)
+            for query in queries
+        )
+
+    def test_01_batched_genres(self, admin_client):
+        from reviews.models import Category, Genre, GenreTitle
+
+        Category.objects.create(name='Фильмы', slug='films')
+        for slug in ('a', 'b', 'c', 'd'):
+            Genre.objects.create(name=f'Жанр {slug}', slug=slug)
+
+        _, one = self.post_title(admin_client, ['a'])
+        response, three = self.post_title(admin_client, ['a', 'b', 'c'])
+        assert len(one) == len(three), (
+            'Проверьте, что число запросов при создании произведения '
+            'не зависит от числа жанров.'
+        )
+        assert self.count(three, '"reviews_genre"."slug" IN') == 1, (
+            'Проверьте, что слаги жанров разрешаются одним запросом IN.'
+        )
+        assert [genre['slug'] for genre in response.json()['genre']] == [
+            'a', 'b', 'c'
+        ]
+
+        title_id = response.json()['id']
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(
+                f'{self.TITLES_URL}{title_id}/', data={'genre': ['c', 'd']},
+                format='json'
+            )
+        assert response.status_code == 200
+        assert [genre['slug'] for genre in response.json()['genre']] == [
+            'c', 'd'
+        ]
+        queries = context.captured_queries
+        assert self.count(queries, 'INSERT INTO "reviews_genretitle"') == 1
+        assert self.count(queries, 'DELETE FROM "reviews_genretitle"') == 1
+        assert set(GenreTitle.objects.filter(title_id=title_id).values_list(
+            'genre__slug', flat=True
+        )) == {'c', 'd'}
+
+        listed = admin_client.get(self.TITLES_URL, {'genre': 'd'}).json()
+        assert [title['id'] for title in listed['results']] == [title_id], (
+            'Проверьте, что новые связи с жанрами видны в списке.'
+        )
+        assert [genre['slug'] for genre in listed['results'][0]['genre']] \
+            == ['c', 'd'], 'Проверьте, что карточка обновила жанры.'
+
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{title_id}/', data={'genre': ['c', 'zzz']},
+            format='json'
+        )
+        assert response.status_code == 400
+        assert 'genre' in response.json()
@@ -0,0 +1,177 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25TitleBulk:
+
+    TITLES_URL = '/api/v1/titles/'
+    BULK_URL = '/api/v1/titles/bulk/'
+
+    @staticmethod
+    def make_items(count, genres=('drama',)):
+        return [
+            {
+                'name': f'Пакетное произведение {index}', 'year': 1990,
+                'category': 'films', 'genre': list(genres),
+            }
+            for index in range(count)
+        ]
+
+    def test_01_bulk_create_and_update(self, client, user_client,
+                                       admin_client):
+        from api.facets import title_facet_index
+        from reviews.models import Category, Genre, Title, TitleRanking
+
+        Category.objects.create(name='Фильмы', slug='films')
+        Category.objects.create(name='Книги', slug='books')
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        existing = Title.objects.create(name='Старое', year=1950)
+        title_facet_index.filter()
+
+        items = self.make_items(2)
+        assert client.post(
+            self.BULK_URL, json.dumps(items), content_type='application/json'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.post(
+            self.BULK_URL, items, format='json'
+        ).status_code == HTTPStatus.FORBIDDEN
+
+        items.insert(1, {
+            'id': existing.pk, 'name': 'Обновлённое', 'category': 'books',
+            'genre': ['comedy', 'drama'],
+        })
+        response = admin_client.post(self.BULK_URL, items, format='json')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что администратор может загрузить пакет произведений.'
+        )
+        data = response.json()
+        assert [item['name'] for item in data] == [
+            'Пакетное произведение 0', 'Обновлённое', 'Пакетное произведение 1'
+        ], 'Проверьте, что ответ идёт в порядке пакета.'
+        assert data[1]['id'] == existing.pk
+        assert data[1]['year'] == 1950
+        assert data[1]['category'] == {'name': 'Книги', 'slug': 'books'}
+        assert [genre['slug'] for genre in data[1]['genre']] == [
+            'drama', 'comedy'
+        ]
+        assert Title.objects.count() == 3
+        assert TitleRanking.objects.count() == 3
+
+        listed = client.get(self.TITLES_URL, {'genre': 'comedy'}).json()
+        assert [title['name'] for title in listed['results']] == [
+            'Обновлённое'
+        ], 'Проверьте, что пакетная запись обновляет карточки и фильтры.'
+        assert set(title_facet_index.filter(genres=['drama'])) == {
+            item['id'] for item in data
+        }, 'Проверьте, что пакетная запись обновляет фасетный индекс.'
+        suggestions = client.get(
+            f'{self.TITLES_URL}autocomplete/', {'q': 'пакет'}
+        ).json()
+        assert len(suggestions) == 2
+        found = client.get(self.TITLES_URL, {'search': 'пакетное'}).json()
+        assert found['count'] == 2
+
+    def test_02_bulk_errors(self, admin_client):
+        from reviews.models import Category, Genre, Title
+
+        Category.objects.create(name='Фильмы', slug='films')
+        Genre.objects.create(name='Драма', slug='drama')
+        items = self.make_items(4)
+        items[1]['genre'] = ['unknown']
+        del items[2]['name']
+        items[3] = {'id': 999, 'name': 'Нет такого'}
+        response = admin_client.post(self.BULK_URL, items, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert len(errors) == 4, (
+            'Проверьте, что ошибки возвращаются для каждого элемента пакета.'
+        )
+        assert errors[0] == {}
+        assert set(errors[1]) == {'genre'}
+        assert set(errors[2]) == {'name'}
+        assert set(errors[3]) == {'id'}
+        assert not Title.objects.exists(), (
+            'Проверьте, что пакет с ошибками не записывается частично.'
+        )
+
+        response = admin_client.post(
+            self.BULK_URL, {'name': 'Не список'}, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_bulk_queries(self, admin_client):
+        from reviews.models import Category, Genre
+
+        Category.objects.create(name='Фильмы', slug='films')
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        counts = []
+        for size in (2, 20):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(
+                    self.BULK_URL, self.make_items(size, ('drama', 'comedy')),
+                    format='json'
+                )
+            assert response.status_code == HTTPStatus.OK
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1], (
+            'Проверьте, что число запросов не зависит от размера пакета.'
+        )
+
+    def test_04_bulk_after_delete(self, admin_client):
+        from api.purge import purge_deleted
+        from reviews.models import Category, Genre, Title
+
+        Category.objects.create(name='Фильмы', slug='films')
+        Genre.objects.create(name='Драма', slug='drama')
+        response = admin_client.post(
+            self.BULK_URL, self.make_items(2), format='json'
+        )
+        last_id = response.json()[-1]['id']
+        admin_client.delete(f'{self.TITLES_URL}{last_id}/')
+        response = admin_client.post(
+            self.BULK_URL, self.make_items(1), format='json'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что пакет создаётся после удаления произведения.'
+        )
+        purged_id = response.json()[0]['id']
+        assert purged_id > last_id
+        admin_client.delete(f'{self.TITLES_URL}{purged_id}/')
+        purge_deleted()
+        response = admin_client.post(
+            self.BULK_URL, self.make_items(1), format='json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()[0]['id'] > purged_id, (
+            'Проверьте, что id очищенных произведений не выдаются повторно.'
+        )
+        assert Title.objects.count() == 2
+
+    def test_05_bulk_transaction_starts_with_write(self, admin_client):
+        from reviews.models import Category, Genre
+
+        Category.objects.create(name='Фильмы', slug='films')
+        Genre.objects.create(name='Драма', slug='drama')
+        items = self.make_items(2)
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(
+                    self.BULK_URL, items, format='json'
+                )
+            assert response.status_code == HTTPStatus.OK
+            items = [{'id': title['id'], 'year': 1991}
+                     for title in response.json()]
+            queries = [query['sql'] for query in context.captured_queries]
+            begin = queries.index('BEGIN')
+            assert queries[begin + 1].startswith(('UPDATE', 'INSERT')), (
+                'Проверьте, что транзакция пакета начинается с записи: '
+                'в SQLite транзакция, начатая с чтения, не дожидается '
+                f'блокировки на запись. Запросы: {queries[begin:]}'
+            )
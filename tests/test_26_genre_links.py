@@ -0,0 +1,68 @@
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26GenreLinks:
+
+    def test_01_unique_links(self):
+        from reviews.models import Genre, GenreTitle, Title
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        GenreTitle.objects.create(title=title, genre=genre)
+        with pytest.raises(IntegrityError), transaction.atomic():
+            GenreTitle.objects.create(title=title, genre=genre)
+
+    def test_02_dedupe_command(self, monkeypatch):
+        from reviews.models import Genre, GenreTitle, Title
+
+        meta = GenreTitle._meta
+        # Таблица, созданная до появления ограничения и индекса.
+        with monkeypatch.context() as patch:
+            patch.setattr(meta, 'constraints', [])
+            patch.setattr(meta, 'indexes', [])
+            with connection.schema_editor() as editor:
+                editor.delete_model(GenreTitle)
+                editor.create_model(GenreTitle)
+        title = Title.objects.create(name='Произведение', year=2000)
+        genres = [
+            Genre.objects.create(name=f'Жанр {slug}', slug=slug)
+            for slug in ('a', 'b')
+        ]
+        for genre in genres + genres + genres[:1]:
+            GenreTitle.objects.create(title=title, genre=genre)
+
+        call_command('dedupe_genre_links')
+        call_command('dedupe_genre_links')
+        assert sorted(GenreTitle.objects.values_list(
+            'genre__slug', flat=True
+        )) == ['a', 'b'], (
+            'Проверьте, что команда `dedupe_genre_links` удаляет повторы.'
+        )
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, meta.db_table
+            )
+        assert 'genretitle_genre_title_idx' in constraints
+        assert any(
+            info['unique'] and info['columns'] == ['title_id', 'genre_id']
+            for info in constraints.values()
+        ), 'Проверьте, что команда добавляет уникальное ограничение.'
+
+    def test_03_lookups_use_indexes(self):
+        from reviews.models import Genre, GenreTitle, Title
+
+        for queryset, fragment in (
+            (Genre.objects.filter(titles=1),
+             'COVERING INDEX sqlite_autoindex_reviews_genretitle_1'),
+            (GenreTitle.objects.filter(genre_id=1).values('title_id'),
+             'COVERING INDEX genretitle_genre_title_idx'),
+            (GenreTitle.objects.filter(title_id=1).values('genre_id'),
+             'COVERING INDEX sqlite_autoindex_reviews_genretitle_1'),
+        ):
+            plan = queryset.explain()
+            assert fragment in plan, (
+                f'Проверьте индексы связей с жанрами. План запроса: {plan}'
+            )
@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27NestedLookups:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @staticmethod
+    def loads_row(queries, table):
+        """Есть ли запрос, читающий строку таблицы целиком."""
+        return any(
+            f'SELECT "{table}"."id", ' in query['sql']
+            for query in queries
+        )
+
+    def test_01_review_must_belong_to_title(self, client, admin_client,
+                                            admin, user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        review_id = reviews[0]['id']
+        wrong_url = (
+            f'{self.TITLES_URL}{titles[1]["id"]}/reviews/{review_id}/'
+            'comments/'
+        )
+        assert client.get(wrong_url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии недоступны по адресу с чужим '
+            'произведением.'
+        )
+        response = user_client.post(wrong_url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert client.get(
+            f'{self.TITLES_URL}999/reviews/'
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_parents_not_loaded(self, client, admin_client, admin,
+                                   user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        reviews_url = f'{self.TITLES_URL}{titles[1]["id"]}/reviews/'
+        comments_url = (
+            f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            assert client.get(reviews_url).status_code == HTTPStatus.OK
+        assert not self.loads_row(context.captured_queries, 'reviews_title'), (
+            'Проверьте, что список отзывов не загружает произведение.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            assert client.get(comments_url).status_code == HTTPStatus.OK
+        assert not self.loads_row(
+            context.captured_queries, 'reviews_review'
+        ), 'Проверьте, что список комментариев не загружает отзыв.'
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(comments_url, data={'text': 'Ещё'})
+        assert response.status_code == HTTPStatus.CREATED
+        assert not self.loads_row(
+            context.captured_queries, 'reviews_review'
+        ), 'Проверьте, что создание комментария не загружает отзыв.'
@@ -0,0 +1,133 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28ReviewConstraint:
+
+    DUPLICATE_MESSAGE = (
+        'Нельзя оставлять более одного отзыва на это произведение'
+    )
+    PARALLEL_POSTS = 8
+
+    def test_01_duplicate_review(self, admin_client, user_client):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Да', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+        assert not any(
+            'SELECT 1 AS "a" FROM "reviews_review"' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что перед созданием отзыва нет запроса exists().'
+
+        response = user_client.post(url, data={'text': 'Ещё', 'score': 1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            'non_field_errors': [self.DUPLICATE_MESSAGE]
+        }
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.review_count) == (7, 1), (
+            'Проверьте, что отклонённый отзыв не меняет рейтинг.'
+        )
+        assert Review.objects.count() == 1
+
+    def test_02_concurrent_duplicate(self, admin_client, user,
+                                     user_client, monkeypatch):
+        from api.serializers import ReviewSerializer
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        is_valid = ReviewSerializer.is_valid
+
+        def is_valid_then_race(serializer, *args, **kwargs):
+            # Параллельный запрос успевает создать отзыв после проверки.
+            result = is_valid(serializer, *args, **kwargs)
+            Review.objects.create(
+                title_id=title_id, author=user, text='Первый', score=3
+            )
+            return result
+
+        monkeypatch.setattr(ReviewSerializer, 'is_valid', is_valid_then_race)
+        response = user_client.post(
+            f'/api/v1/titles/{title_id}/reviews/',
+            data={'text': 'Второй', 'score': 9}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что нарушение ограничения уникальности отзыва '
+            'возвращает ответ 400.'
+        )
+        assert response.json() == {
+            'non_field_errors': [self.DUPLICATE_MESSAGE]
+        }
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.review_count) == (3, 1)
+
+    def test_03_parallel_posts(self, admin_client, user):
+        from reviews.models import Review, Title
+
+        assert not connection.is_in_memory_db(), (
+            'Параллельные запросы проверяются на файловой тестовой базе.'
+        )
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        barrier = threading.Barrier(self.PARALLEL_POSTS)
+        statuses = []
+
+        def post(score):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                barrier.wait()
+                response = client.post(
+                    url, data={'text': 'Параллельно', 'score': score}
+                )
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=post, args=(score,))
+            for score in range(1, self.PARALLEL_POSTS + 1)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(statuses) == [HTTPStatus.CREATED] + [
+            HTTPStatus.BAD_REQUEST
+        ] * (self.PARALLEL_POSTS - 1), (
+            'Проверьте, что параллельные повторные отзывы получают ответ 400.'
+        )
+        review = Review.objects.get()
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.review_count) == (review.score, 1)
+
+    def test_04_other_integrity_errors(self, admin_client, user_client,
+                                       monkeypatch):
+        from django.db import IntegrityError
+
+        from api.serializers import ReviewSerializer
+
+        titles, _, _ = create_titles(admin_client)
+
+        def save(serializer, **kwargs):
+            raise IntegrityError('NOT NULL constraint failed')
+
+        monkeypatch.setattr(ReviewSerializer, 'save', save)
+        with pytest.raises(IntegrityError):
+            user_client.post(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+                data={'text': 'Да', 'score': 7}
+            )
@@ -0,0 +1,79 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29TitleStats:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @staticmethod
+    def histogram(counts):
+        return [
+            {'score': score, 'count': counts.get(score, 0)}
+            for score in range(1, 11)
+        ]
+
+    def test_01_stats(self, client, admin_client, django_assert_num_queries):
+        from reviews.models import Review, Title, TitleScoreCount, User
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        other = Title.objects.create(name='Другое', year=2000)
+        authors = [
+            User.objects.create(username=f'u{idx}', email=f'u{idx}@yamdb.fake')
+            for idx in range(4)
+        ]
+        reviews = [
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+            for author, score in zip(authors, (8, 8, 3, 10))
+        ]
+        url = f'{self.TITLES_URL}{title.pk}/stats/'
+        # Пользователь из сессии и счётчики оценок.
+        with django_assert_num_queries(2):
+            response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            'count': 4, 'mean': 7.25,
+            'histogram': self.histogram({3: 1, 8: 2, 10: 1}),
+        }, 'Проверьте статистику оценок произведения.'
+
+        reviews[0].score = 3
+        reviews[0].save()
+        reviews[1].title = other
+        reviews[1].save()
+        reviews[2].delete()
+        assert admin_client.get(url).json() == {
+            'count': 2, 'mean': 6.5,
+            'histogram': self.histogram({3: 1, 10: 1}),
+        }, 'Проверьте, что статистика следует за изменениями отзывов.'
+        assert client.get(
+            f'{self.TITLES_URL}{other.pk}/stats/'
+        ).json()['histogram'] == self.histogram({8: 1})
+
+        empty = Title.objects.create(name='Пустое', year=2000)
+        assert client.get(f'{self.TITLES_URL}{empty.pk}/stats/').json() == {
+            'count': 0, 'mean': None, 'histogram': self.histogram({}),
+        }
+        assert client.get(
+            f'{self.TITLES_URL}999/stats/'
+        ).status_code == HTTPStatus.NOT_FOUND
+
+        expected = set(
+            TitleScoreCount.objects.filter(count__gt=0).values_list(
+                'title_id', 'score', 'count'
+            )
+        )
+        TitleScoreCount.objects.all().delete()
+        call_command('rebuild_title_score_counts')
+        assert set(TitleScoreCount.objects.values_list(
+            'title_id', 'score', 'count'
+        )) == expected, (
+            'Проверьте, что команда `rebuild_title_score_counts` '
+            'восстанавливает счётчики.'
+        )
+        title.delete()
+        assert not TitleScoreCount.objects.filter(title_id=title.pk).exists()
@@ -0,0 +1,51 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30CommentCounts:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_comment_count(self, client, admin_client, admin,
+                              user_client, user, django_assert_num_queries):
+        from reviews.models import Comment, Review
+
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        reviews_url = f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+        review_url = f'{reviews_url}{reviews[0]["id"]}/'
+
+        response = client.get(reviews_url)
+        etag = response['ETag']
+        # Last-Modified, произведение, COUNT и страница с авторами.
+        with django_assert_num_queries(4):
+            response = client.get(reviews_url)
+        counts = {
+            review['id']: review['comment_count']
+            for review in response.json()['results']
+        }
+        assert counts[reviews[0]['id']] == len(comments), (
+            'Проверьте, что отзыв содержит поле `comment_count`.'
+        )
+        assert set(counts.values()) == {0, len(comments)}
+
+        response = admin_client.patch(review_url, data={'text': 'Правка'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['comment_count'] == len(comments), (
+            'Проверьте, что изменение отзыва не сбрасывает число комментариев.'
+        )
+        user_client.post(f'{review_url}comments/', data={'text': 'Ещё'})
+        Comment.objects.filter(pk=comments[0]['id']).get().delete()
+        assert Review.objects.get(
+            pk=reviews[0]['id']
+        ).comment_count == len(comments)
+        assert client.get(
+            reviews_url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что новый комментарий меняет ETag списка отзывов.'
+        )
+        assert client.get(review_url).json()['comment_count'] == len(comments)
@@ -0,0 +1,157 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31SoftDelete:
+
+    TITLES_URL = '/api/v1/titles/'
+    USERS_URL = '/api/v1/users/'
+
+    def test_01_title_soft_delete(self, client, admin_client, admin,
+                                  user_client, user):
+        from api.facets import title_facet_index
+        from reviews.models import (
+            Comment, GenreTitle, Review, Title, TitleRanking, TitleScoreCount
+        )
+
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        title_id = titles[0]['id']
+        title_url = f'{self.TITLES_URL}{title_id}/'
+        title_facet_index.filter()
+
+        response = admin_client.delete(title_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert Review.objects.filter(title_id=title_id).exists(), (
+            'Проверьте, что отзывы удаляются не в запросе, а фоновой очисткой.'
+        )
+        for url in (
+            title_url,
+            f'{title_url}reviews/',
+            f'{title_url}reviews/{reviews[0]["id"]}/comments/',
+            f'{title_url}stats/',
+        ):
+            assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что удалённое произведение скрыто: `{url}`.'
+            )
+        listed = [
+            title['id']
+            for title in client.get(self.TITLES_URL).json()['results']
+        ]
+        assert title_id not in listed
+        assert all(
+            title['id'] != title_id
+            for title in client.get(f'{self.TITLES_URL}top/').json()['results']
+        )
+        assert title_id not in title_facet_index.filter()
+        suggestions = client.get(
+            f'{self.TITLES_URL}autocomplete/', {'q': titles[0]['name']}
+        ).json()
+        assert all(item['id'] != title_id for item in suggestions)
+
+        call_command('purge_deleted', batch_size=1)
+        assert not Title.all_objects.filter(pk=title_id).exists()
+        for model in (Review, GenreTitle, TitleRanking, TitleScoreCount):
+            assert not model.objects.filter(title_id=title_id).exists(), (
+                f'Проверьте, что очистка удаляет строки {model.__name__}.'
+            )
+        assert not Comment.objects.filter(review_id=reviews[0]['id']).exists()
+        assert Title.objects.filter(pk=titles[1]['id']).exists()
+
+    def test_02_user_soft_delete(self, admin_client, admin, user_client,
+                                 user):
+        from reviews.models import Comment, Review, Title, TitleRanking, User
+        from reviews.rankings import (
+            get_catalog_totals,
+            get_ranking_state,
+            get_trending_weight,
+            reconcile_title_rankings
+        )
+        from reviews.stats import get_title_stats
+
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        admin_review = Review.objects.get(
+            author=admin, title_id=titles[0]['id']
+        )
+        comment_count = admin_review.comment_count
+
+        response = admin_client.delete(f'{self.USERS_URL}{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert admin_client.get(
+            f'{self.USERS_URL}{user.username}/'
+        ).status_code == HTTPStatus.NOT_FOUND
+        assert user_client.get(
+            f'{self.USERS_URL}me/'
+        ).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что удалённый пользователь не может войти.'
+        )
+        assert Review.objects.filter(author=user).exists()
+        user_review = Review.objects.filter(author=user).first()
+        reviews_url = f'{self.TITLES_URL}{user_review.title_id}/reviews/'
+        listed = admin_client.get(reviews_url).json()['results']
+        assert user_review.pk not in [review['id'] for review in listed], (
+            'Проверьте, что отзывы удалённого пользователя скрыты.'
+        )
+        assert admin_client.get(
+            f'{reviews_url}{user_review.pk}/comments/'
+        ).status_code == HTTPStatus.NOT_FOUND
+        comments = admin_client.get(
+            f'{reviews_url}{admin_review.pk}/comments/'
+        ).json()['results']
+        assert len(comments) == comment_count - 1, (
+            'Проверьте, что комментарии удалённого пользователя скрыты.'
+        )
+
+        data = {'username': user.username, 'email': user.email}
+        response = admin_client.post(self.USERS_URL, data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что имя удалённого пользователя остаётся занятым.'
+        )
+        assert set(response.json()) == {'username', 'email'}
+        response = admin_client.post(
+            '/api/v1/auth/signup/', data, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'username' in response.json()
+
+        call_command('purge_deleted', batch_size=1)
+        assert not User.all_objects.filter(pk=user.pk).exists()
+        response = admin_client.post(self.USERS_URL, data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что после очистки имя снова свободно.'
+        )
+        assert not Review.objects.filter(author=user).exists()
+        assert not Comment.objects.filter(author=user).exists()
+        admin_review.refresh_from_db()
+        assert admin_review.comment_count == comment_count - 1, (
+            'Проверьте, что очистка уменьшает число комментариев отзывов.'
+        )
+        for title in Title.objects.all():
+            scores = list(title.reviews.values_list('score', flat=True))
+            assert (title.score_sum, title.review_count) == (
+                sum(scores), len(scores)
+            ), 'Проверьте, что очистка пересчитывает агрегаты произведений.'
+            assert get_title_stats(title.pk)['count'] == len(scores)
+        rankings = dict(
+            TitleRanking.objects.values_list('title_id', 'trending_score')
+        )
+        totals = get_catalog_totals()
+        state = get_ranking_state()
+        assert (state.score_sum, state.review_count) == totals, (
+            'Проверьте, что очистка вычитает оценки из сумм каталога.'
+        )
+        reconcile_title_rankings()
+        # Пересчёт переносит эпоху весов: популярность масштабируется.
+        scale = get_trending_weight(
+            state.trending_epoch, get_ranking_state().trending_epoch
+        )
+        for title_id, score in TitleRanking.objects.values_list(
+            'title_id', 'trending_score'
+        ):
+            assert rankings[title_id] * scale == pytest.approx(score)